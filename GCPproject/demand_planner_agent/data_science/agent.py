@@ -18,6 +18,7 @@
 -- then, it use NL2Py to do further data analysis as needed
 """
 
+import asyncio
 import base64
 import json
 import logging
@@ -44,8 +45,10 @@ from .sub_agents.bigquery.tools import (
 )
 from .tools import (
     call_analytics_agent,
+    call_analytics_pipeline,
     call_bigquery_agent,
     call_research_agent,
+    warm_up,
 )
 
 # Configure Weave endpoint and authentication (only if configured)
@@ -191,7 +194,7 @@ def load_database_settings_in_context(callback_context: CallbackContext):
 
 def get_root_agent() -> LlmAgent:
     # Core tools always available
-    tools = [call_analytics_agent, call_research_agent]
+    tools = [call_analytics_agent, call_analytics_pipeline, call_research_agent]
     sub_agents = []
     
     # Add dataset-specific tools and sub-agents
@@ -229,6 +232,24 @@ def get_root_agent() -> LlmAgent:
 # Database settings are loaded lazily via before_agent_callback.
 
 _root_agent_instance = None
+_warm_up_task = None
+
+# Sub-agents used through tools, pre-built in the background on first use
+# (BQML is already built with the root agent; AlloyDB is not deployed).
+_WARM_UP_AGENTS = ["bigquery", "analytics", "research"]
+
+
+def _schedule_warm_up() -> None:
+    """Start building tool sub-agents in the background, once per process."""
+    global _warm_up_task
+    if _warm_up_task is not None:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    # Keep a reference so the task is not garbage collected mid-run
+    _warm_up_task = loop.create_task(warm_up(_WARM_UP_AGENTS))
 
 
 def _lazy_load_settings_callback(callback_context: CallbackContext):
@@ -245,6 +266,8 @@ def _lazy_load_settings_callback(callback_context: CallbackContext):
         except Exception as e:
             _logger.error(f"Failed to load database settings: {e}")
             raise
+
+        _schedule_warm_up()
     
     # Store in callback context
     if "database_settings" not in callback_context.state:
@@ -266,6 +289,7 @@ def _initialize_root_agent() -> LlmAgent:
     # Core tools always available
     tools = [
         call_analytics_agent,
+        call_analytics_pipeline,
         call_research_agent,
         call_bigquery_agent,
     ]
@@ -5,13 +5,31 @@ Tracing is enabled via environment variables (recommended approach):
 - OTEL_INSTRUMENTATION_GENAI_CAPTURE_MESSAGE_CONTENT=true
 
 These are set in .agent_engine_env and passed during deployment.
+
+When telemetry is not enabled (and no Weave/W&B export is configured), the
+OpenTelemetry SDK is disabled before vertexai is imported so no exporter
+threads or OTLP retry loops are started.
 """
-from vertexai.preview.reasoning_engines import AdkApp
-from data_science.agent import root_agent
+import os
+
+_TELEMETRY_ENABLED = os.getenv(
+    "GOOGLE_CLOUD_AGENT_ENGINE_ENABLE_TELEMETRY", ""
+).lower() in {"1", "true", "yes"}
+_WANDB_EXPORT_ENABLED = bool(
+    os.getenv("WANDB_API_KEY") and os.getenv("WANDB_PROJECT_ID")
+)
+
+if not _TELEMETRY_ENABLED and not _WANDB_EXPORT_ENABLED:
+    # setdefault so an explicit OTEL_* configuration still wins
+    os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+    os.environ.setdefault("OTEL_TRACES_EXPORTER", "none")
+
+from vertexai.preview.reasoning_engines import AdkApp  # noqa: E402
+
+from data_science.agent import root_agent  # noqa: E402
 
 # Create AdkApp - tracing controlled by env vars, not the deprecated enable_tracing flag
 adk_app = AdkApp(
     agent=root_agent,
     # Note: enable_tracing is deprecated, use GOOGLE_CLOUD_AGENT_ENGINE_ENABLE_TELEMETRY env var instead
 )
-
@@ -172,9 +172,10 @@ def return_instructions_root() -> str:
              query for the relevant db agent.
           * **SQL Query:** Call the relevant db agent. Once you return the
              answer, provide additional explanations.
-          * **SQL & Python Analysis:** Call the relevant db agent, then
-             `call_analytics_agent`. Once you return the answer, provide additional
-             explanations.
+          * **SQL & Python Analysis:** Call `call_analytics_pipeline` with the
+             db question and the analytics request, or the relevant db agent
+             then `call_analytics_agent`. Once you return the answer, provide
+             additional explanations.
           * **BQ ML `call_bqml_agent` (for ALL prediction tasks):** 
              Use for ANY prediction request (e.g., "predict POS sales").
              A. First ensure data exists for the date (use research_agent if not).
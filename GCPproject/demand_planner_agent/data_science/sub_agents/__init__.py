@@ -13,15 +13,29 @@
 # limitations under the License.
 
 # Lazy imports to support Agent Engine deployment
-# Individual agents should be imported within functions that use them
+# Sub-agent modules are only imported when one of their symbols is accessed,
+# so importing this package does not pull in google.adk / google.genai.
 # Note: AlloyDB agent removed - not used in this deployment
-from .analytics.agent import get_analytics_agent
-from .bigquery.agent import get_bigquery_agent
-from .bqml.agent import get_bqml_agent
-from .research.agent import research_agent
+import importlib
+
+_LAZY_ATTRS = {
+    "get_analytics_agent": ".analytics.agent",
+    "get_bigquery_agent": ".bigquery.agent",
+    "get_bqml_agent": ".bqml.agent",
+    "get_research_agent": ".research.agent",
+}
 
 # For backwards compatibility - use get_*_agent() functions instead
 bigquery_agent = None
 bqml_agent = None  # Use get_bqml_agent() function instead
 analytics_agent = None
-alloydb_agent = None  # Placeholder - AlloyDB not used
+
+
+def __getattr__(name):
+    if name == "research_agent":
+        # Backwards compatibility: build the research agent on first access
+        return __getattr__("get_research_agent")()
+    if name in _LAZY_ATTRS:
+        module = importlib.import_module(_LAZY_ATTRS[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
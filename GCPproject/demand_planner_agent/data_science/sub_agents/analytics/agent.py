@@ -15,6 +15,7 @@
 """Analytics Agent: generate nl2py and use code interpreter to run the code."""
 
 import os
+import threading
 
 from google.adk.agents import Agent
 from google.adk.code_executors import VertexAiCodeExecutor
@@ -23,21 +24,25 @@ from .prompts import return_instructions_analytics
 
 # Lazy initialization for Agent Engine compatibility
 _analytics_agent = None
+# Guards construction: request threads and warm-up may race on first use
+_init_lock = threading.Lock()
 
 
 def get_analytics_agent():
     """Lazily initialize and return the analytics agent."""
     global _analytics_agent
     if _analytics_agent is None:
-        _analytics_agent = Agent(
-            model=os.getenv("ANALYTICS_AGENT_MODEL", ""),
-            name="analytics_agent",
-            instruction=return_instructions_analytics(),
-            code_executor=VertexAiCodeExecutor(
-                optimize_data_file=True,
-                stateful=True,
-            ),
-        )
+        with _init_lock:
+            if _analytics_agent is None:
+                _analytics_agent = Agent(
+                    model=os.getenv("ANALYTICS_AGENT_MODEL", ""),
+                    name="analytics_agent",
+                    instruction=return_instructions_analytics(),
+                    code_executor=VertexAiCodeExecutor(
+                        optimize_data_file=True,
+                        stateful=True,
+                    ),
+                )
     return _analytics_agent
 
 
@@ -18,7 +18,10 @@ This module defines functions that return instruction prompts for the analytics
 agent.  These instructions guide the agent's behavior, workflow, and tool usage.
 """
 
+import functools
 
+
+@functools.cache
 def return_instructions_analytics() -> str:
     instruction_prompt_analytics = """
   # Guidelines
@@ -16,6 +16,7 @@
 
 import logging
 import os
+import threading
 from typing import Any
 
 from google.adk.agents import LlmAgent
@@ -68,6 +69,8 @@ bigquery_tool_filter = [ADK_BUILTIN_BQ_EXECUTE_SQL_TOOL]
 # Lazy-loaded globals for Agent Engine compatibility
 _bigquery_toolset = None
 _bigquery_agent = None
+# Guards construction: request threads and warm-up may race on first use
+_init_lock = threading.Lock()
 
 
 def _get_bigquery_toolset():
@@ -87,23 +90,25 @@ def get_bigquery_agent():
     """Lazily initialize and return the BigQuery agent."""
     global _bigquery_agent
     if _bigquery_agent is None:
-        nl2sql_method = os.getenv("NL2SQL_METHOD", "BASELINE")
-        _bigquery_agent = LlmAgent(
-            model=os.getenv("BIGQUERY_AGENT_MODEL", ""),
-            name="bigquery_agent",
-            instruction=return_instructions_bigquery(),
-            tools=[
-                (
-                    chase_db_tools.initial_bq_nl2sql
-                    if nl2sql_method == "CHASE"
-                    else tools.bigquery_nl2sql
-                ),
-                _get_bigquery_toolset(),
-            ],
-            before_agent_callback=setup_before_agent_call,
-            after_tool_callback=store_results_in_context,
-            generate_content_config=types.GenerateContentConfig(temperature=0.01),
-        )
+        with _init_lock:
+            if _bigquery_agent is None:
+                nl2sql_method = os.getenv("NL2SQL_METHOD", "BASELINE")
+                _bigquery_agent = LlmAgent(
+                    model=os.getenv("BIGQUERY_AGENT_MODEL", ""),
+                    name="bigquery_agent",
+                    instruction=return_instructions_bigquery(),
+                    tools=[
+                        (
+                            chase_db_tools.initial_bq_nl2sql
+                            if nl2sql_method == "CHASE"
+                            else tools.bigquery_nl2sql
+                        ),
+                        _get_bigquery_toolset(),
+                    ],
+                    before_agent_callback=setup_before_agent_call,
+                    after_tool_callback=store_results_in_context,
+                    generate_content_config=types.GenerateContentConfig(temperature=0.01),
+                )
     return _bigquery_agent
 
 
@@ -15,6 +15,7 @@
 """BigQuery ML Agent."""
 
 import os
+import threading
 
 from google.adk.agents import Agent
 from google.adk.agents.callback_context import CallbackContext
@@ -38,6 +39,8 @@ ADK_BUILTIN_BQ_EXECUTE_SQL_TOOL = "execute_sql"
 # Lazy-loaded globals for Agent Engine compatibility
 _bq_execute_sql = None
 _root_agent = None
+# Guards construction: request threads and warm-up may race on first use
+_init_lock = threading.Lock()
 
 
 def setup_before_agent_call(callback_context: CallbackContext):
@@ -103,13 +106,15 @@ def get_bqml_agent():
     """Lazily initialize and return the BQML agent."""
     global _root_agent
     if _root_agent is None:
-        _root_agent = Agent(
-            model=os.getenv("BQML_AGENT_MODEL", "gemini-2.5-flash"),  # Default for Agent Engine
-            name="bq_ml_agent",
-            instruction=return_instructions_bqml(),
-            before_agent_callback=setup_before_agent_call,
-            tools=[_get_bq_execute_sql(), check_bq_models, call_db_agent, rag_response],
-        )
+        with _init_lock:
+            if _root_agent is None:
+                _root_agent = Agent(
+                    model=os.getenv("BQML_AGENT_MODEL", "gemini-2.5-flash"),  # Default for Agent Engine
+                    name="bq_ml_agent",
+                    instruction=return_instructions_bqml(),
+                    before_agent_callback=setup_before_agent_call,
+                    tools=[_get_bq_execute_sql(), check_bq_models, call_db_agent, rag_response],
+                )
     return _root_agent
 
 
@@ -18,12 +18,19 @@ This module defines functions that return instruction prompts for the bqml_agent
 These instructions guide the agent's behavior, workflow, and tool usage.
 """
 
+import functools
 import os
 
 
 def return_instructions_bqml() -> str:
     # Get project ID at runtime (lazy), not at import time
     compute_project_id = os.getenv("BQ_COMPUTE_PROJECT_ID", "")
+    return _build_instructions_bqml(compute_project_id)
+
+
+@functools.lru_cache(maxsize=4)
+def _build_instructions_bqml(compute_project_id: str) -> str:
+    # Built once per compute project; later calls reuse the same string
     instruction_prompt_bqml_v3 = f"""
     <CONTEXT>
         <TASK>
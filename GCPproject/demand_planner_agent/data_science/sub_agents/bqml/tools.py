@@ -12,12 +12,19 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import functools
 import os
 
 from google.cloud import bigquery
 from vertexai import rag
 
 
+@functools.lru_cache(maxsize=1)
+def _get_bq_client() -> bigquery.Client:
+    """Returns a BigQuery client shared across tool calls."""
+    return bigquery.Client()
+
+
 def check_bq_models(dataset_id: str) -> str:
     """Lists models in a BigQuery dataset and returns them as a string.
 
@@ -31,7 +38,7 @@ def check_bq_models(dataset_id: str) -> str:
     """
 
     try:
-        client = bigquery.Client()
+        client = _get_bq_client()
 
         models = client.list_models(dataset_id)
         model_list = []  # Initialize as a list
@@ -14,9 +14,16 @@
 
 """Research Agent Package - Collects demand driver data from multiple sources."""
 
-from .agent import research_agent
 
-__all__ = ["research_agent"]
+def __getattr__(name):
+    # Lazy import so the package can be imported without building the agent
+    if name in ("get_research_agent", "research_agent"):
+        from . import agent
 
+        if name == "research_agent":
+            return agent.get_research_agent()
+        return agent.get_research_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
+__all__ = ["get_research_agent", "research_agent"]
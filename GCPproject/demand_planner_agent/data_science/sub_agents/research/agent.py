@@ -15,27 +15,51 @@
 """Research Agent for collecting and inserting demand driver data."""
 
 import os
+import threading
 from datetime import date
 
 from google.adk.agents import LlmAgent
+from google.adk.agents.callback_context import CallbackContext
 from google.genai import types
 
 from .prompts import return_instructions_research
 from .tools import fetch_and_insert_demand_data, store_qualitative_description
 
+# {today} is filled from session state by ADK when the instruction is rendered
+_GLOBAL_INSTRUCTION = """
+    Today's date is {today}.
+    You can only insert data for dates on or before today, NOT future dates.
+    Always use: product_id=PONDS, customer_id=BLINKIT, location_id=Bangalore.
+"""
 
-research_agent = LlmAgent(
-    model=os.getenv("RESEARCH_AGENT_MODEL", "gemini-2.5-flash"),
-    name="research_agent",
-    instruction=return_instructions_research(),
-    global_instruction=f"""
-        Today's date is {date.today().isoformat()}.
-        You can only insert data for dates on or before today, NOT future dates.
-        Always use: product_id=PONDS, customer_id=BLINKIT, location_id=Bangalore.
-    """,
-    tools=[
-        fetch_and_insert_demand_data,
-        store_qualitative_description,
-    ],
-    generate_content_config=types.GenerateContentConfig(temperature=0.3),
-)
+
+def setup_before_agent_call(callback_context: CallbackContext) -> None:
+    """Refresh today's date in state so long-lived workers never go stale."""
+    callback_context.state["today"] = date.today().isoformat()
+
+
+# Lazy initialization for Agent Engine compatibility
+_research_agent = None
+# Guards construction: request threads and warm-up may race on first use
+_init_lock = threading.Lock()
+
+
+def get_research_agent():
+    """Lazily initialize and return the research agent."""
+    global _research_agent
+    if _research_agent is None:
+        with _init_lock:
+            if _research_agent is None:
+                _research_agent = LlmAgent(
+                    model=os.getenv("RESEARCH_AGENT_MODEL", "gemini-2.5-flash"),
+                    name="research_agent",
+                    instruction=return_instructions_research(),
+                    global_instruction=_GLOBAL_INSTRUCTION,
+                    before_agent_callback=setup_before_agent_call,
+                    tools=[
+                        fetch_and_insert_demand_data,
+                        store_qualitative_description,
+                    ],
+                    generate_content_config=types.GenerateContentConfig(temperature=0.3),
+                )
+    return _research_agent
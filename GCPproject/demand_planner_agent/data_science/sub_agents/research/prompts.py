@@ -14,7 +14,10 @@
 
 """Module for storing and retrieving agent instructions for Research Agent."""
 
+import functools
 
+
+@functools.cache
 def return_instructions_research() -> str:
     """Returns the instructions for the Research Agent."""
     
@@ -37,10 +40,11 @@ def return_instructions_research() -> str:
     
     ## Available Tools
     
-    1. **fetch_and_insert_demand_data(target_date)**
-       - Fetches a random existing row's feature values from BigQuery
-       - Inserts a NEW row with PONDS/BLINKIT/Bangalore + the target_date
-       - Returns the feature values that were inserted
+    1. **fetch_and_insert_demand_data(target_date, target_dates)**
+       - Fetches random existing rows' feature values from BigQuery
+       - Inserts a NEW row with PONDS/BLINKIT/Bangalore for each date
+       - Returns the feature values that were inserted, plus per-date
+         `inserted` and `failed` lists
     
     2. **store_qualitative_description(description)**
        - Stores your generated qualitative description
@@ -51,6 +55,10 @@ def return_instructions_research() -> str:
     When asked to collect/insert data for a date:
     
     1. Call `fetch_and_insert_demand_data` with the target_date (YYYY-MM-DD format)
+       - If several dates are missing in one request, call it ONCE with all of
+         them in `target_dates` (a list of YYYY-MM-DD strings) instead of
+         calling it once per date
+       - Report any dates listed under `failed` to the user
     
     2. Look at the returned feature values and generate a qualitative description:
        - Start with: "For PONDS at BLINKIT (Bangalore) on [date]:"
@@ -14,13 +14,16 @@
 
 """Tools for the Research Agent - Fetch from BigQuery and insert new records."""
 
+import functools
 import logging
 import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import date
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from google.adk.tools import ToolContext
-from google.cloud import bigquery
 
 logger = logging.getLogger(__name__)
 
@@ -30,7 +33,7 @@ CUSTOMER_ID = "BLINKIT"
 LOCATION_ID = "Bangalore"
 
 # Feature columns to copy from random row (excluding identifiers and target)
-FEATURE_COLUMNS = [
+FEATURE_COLUMNS = (
     "consensus_baseline_forecast",
     "real_time_sales_velocity",
     "ingredient_trend_velocity",
@@ -60,37 +63,313 @@ FEATURE_COLUMNS = [
     "inventory_days_on_hand",
     "distributor_open_orders",
     "stock_out_incidents",
-]
+)
+
+# Identifier fields shared by every inserted row; copied per row
+_ROW_IDENTIFIERS = {
+    "product_id": PRODUCT_ID,
+    "customer_id": CUSTOMER_ID,
+    "location_id": LOCATION_ID,
+}
+
+# SQL built once at import; only the table ref and limit vary per call.
+# TABLESAMPLE reads a random subset of storage blocks instead of
+# scoring and sorting every row with ORDER BY RAND().
+_FEATURE_COLS_SQL = ", ".join(FEATURE_COLUMNS)
+_SAMPLE_QUERY_TMPL = (
+    f"SELECT {_FEATURE_COLS_SQL} FROM `{{table_ref}}` "
+    "TABLESAMPLE SYSTEM (1 PERCENT) LIMIT {limit}"
+)
+_SHUFFLE_QUERY_TMPL = (
+    f"SELECT {_FEATURE_COLS_SQL} FROM `{{table_ref}}` "
+    "ORDER BY RAND() LIMIT {limit}"
+)
+
+# Recently sampled feature rows, keyed by (project_id, dataset_id, table_id).
+# Features are copied from *existing* rows, so our own inserts never need to
+# invalidate an entry; entries simply expire after the TTL. Requests run on
+# separate threads, so every read-modify-write holds _feature_row_lock.
+_FEATURE_ROW_CACHE_SIZE = 8
+_FEATURE_ROW_CACHE_TTL_SECONDS = 600
+_feature_row_cache: "OrderedDict[tuple, tuple[float, dict]]" = OrderedDict()
+_feature_row_lock = threading.Lock()
+
+
+def _get_cached_feature_row(key: tuple) -> Optional[Dict[str, Any]]:
+    """Return a copy of a cached feature row, or None if missing/expired."""
+    with _feature_row_lock:
+        entry = _feature_row_cache.get(key)
+        if entry is None:
+            return None
+        cached_at, row = entry
+        if time.monotonic() - cached_at > _FEATURE_ROW_CACHE_TTL_SECONDS:
+            del _feature_row_cache[key]
+            return None
+        _feature_row_cache.move_to_end(key)
+        return dict(row)
+
+
+def _cache_feature_row(key: tuple, row: Dict[str, Any]) -> None:
+    """Store a sampled feature row, evicting the least recently used entry."""
+    with _feature_row_lock:
+        _feature_row_cache[key] = (time.monotonic(), dict(row))
+        _feature_row_cache.move_to_end(key)
+        while len(_feature_row_cache) > _FEATURE_ROW_CACHE_SIZE:
+            _feature_row_cache.popitem(last=False)
+
+
+@functools.lru_cache(maxsize=4)
+def _get_bq_client(project_id: str):
+    """Return a BigQuery client for the project, reused across tool calls."""
+    # Lazy import: google.cloud.bigquery is only loaded when the tool runs
+    from google.cloud import bigquery
+
+    return bigquery.Client(project=project_id)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_bq_write_client():
+    """Return a BigQuery Storage Write API client, reused across tool calls."""
+    # Lazy import: the storage client is heavyweight and optional
+    from google.cloud import bigquery_storage_v1
+
+    return bigquery_storage_v1.BigQueryWriteClient()
+
+
+def _use_storage_write_api() -> bool:
+    """Whether inserts should go through the Storage Write API."""
+    if os.getenv("USE_STORAGE_WRITE_API", "true").lower() not in {"1", "true", "yes"}:
+        return False
+    try:
+        import google.cloud.bigquery_storage_v1  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+@functools.lru_cache(maxsize=4)
+def _get_write_schema(project_id: str, table_ref: str):
+    """
+    Build a proto2 row descriptor from the table schema, once per table.
+    
+    Returns (descriptor_proto, message_class, {column: bigquery_type}).
+    Raises ValueError for column types the insert path does not map.
+    """
+    from google.protobuf import descriptor_pb2, descriptor_pool, message_factory
+    
+    scalar_types = descriptor_pb2.FieldDescriptorProto
+    proto_types = {
+        "STRING": scalar_types.TYPE_STRING,
+        "INTEGER": scalar_types.TYPE_INT64,
+        "INT64": scalar_types.TYPE_INT64,
+        "FLOAT": scalar_types.TYPE_DOUBLE,
+        "FLOAT64": scalar_types.TYPE_DOUBLE,
+        "NUMERIC": scalar_types.TYPE_STRING,
+        "BIGNUMERIC": scalar_types.TYPE_STRING,
+        "BOOLEAN": scalar_types.TYPE_BOOL,
+        "BOOL": scalar_types.TYPE_BOOL,
+        "DATE": scalar_types.TYPE_INT32,  # days since epoch
+    }
+    
+    table = _get_bq_client(project_id).get_table(table_ref)
+    descriptor = descriptor_pb2.DescriptorProto(name="DemandDriverRow")
+    column_types = {}
+    for number, field in enumerate(table.schema, start=1):
+        if field.mode == "REPEATED" or field.field_type not in proto_types:
+            raise ValueError(f"Unsupported column for Storage Write API: {field.name} ({field.field_type})")
+        descriptor.field.add(
+            name=field.name,
+            number=number,
+            type=proto_types[field.field_type],
+            label=scalar_types.LABEL_OPTIONAL,
+        )
+        column_types[field.name] = field.field_type
+    
+    file_proto = descriptor_pb2.FileDescriptorProto(
+        name="demand_driver_row.proto", syntax="proto2"
+    )
+    file_proto.message_type.add().CopyFrom(descriptor)
+    pool = descriptor_pool.DescriptorPool()
+    pool.AddSerializedFile(file_proto.SerializeToString())
+    message_cls = message_factory.GetMessageClass(
+        pool.FindMessageTypeByName(descriptor.name)
+    )
+    return descriptor, message_cls, column_types
+
+
+def _to_proto_value(bq_type: str, value: Any) -> Any:
+    """Convert a JSON-style row value to its Storage Write API representation."""
+    if bq_type == "DATE":
+        if isinstance(value, str):
+            value = date.fromisoformat(value)
+        return (value - date(1970, 1, 1)).days
+    if bq_type in ("NUMERIC", "BIGNUMERIC"):
+        return str(value)
+    return value
+
+
+def _build_append_request(
+    project_id: str, dataset_id: str, table_id: str, rows: List[Dict[str, Any]]
+):
+    """
+    Build a Storage Write API append of `rows` to the table's default stream.
+    
+    Nothing is sent, so a failure here leaves the table untouched.
+    Returns (write_client, stream_name, request).
+    """
+    from google.cloud.bigquery_storage_v1 import types as bqs_types
+    
+    table_ref = f"{project_id}.{dataset_id}.{table_id}"
+    descriptor, message_cls, column_types = _get_write_schema(project_id, table_ref)
+    
+    proto_rows = bqs_types.ProtoRows()
+    for row in rows:
+        message = message_cls(**{
+            col: _to_proto_value(column_types[col], value)
+            for col, value in row.items()
+            if value is not None and col in column_types
+        })
+        proto_rows.serialized_rows.append(message.SerializeToString())
+    
+    write_client = _get_bq_write_client()
+    stream_name = f"{write_client.table_path(project_id, dataset_id, table_id)}/streams/_default"
+    request = bqs_types.AppendRowsRequest(
+        write_stream=stream_name,
+        proto_rows=bqs_types.AppendRowsRequest.ProtoData(
+            writer_schema=bqs_types.ProtoSchema(proto_descriptor=descriptor),
+            rows=proto_rows,
+        ),
+    )
+    return write_client, stream_name, request
+
+
+def _send_append_request(write_client, stream_name: str, request) -> List[Dict[str, Any]]:
+    """
+    Send a prepared append request.
+    
+    Returns errors in the same per-index shape as `insert_rows_json`. A
+    default-stream append with any invalid row is rejected as a whole, so
+    row errors mark every row in the request as failed, not just the
+    invalid ones.
+    """
+    row_count = len(request.proto_rows.rows.serialized_rows)
+    # The routing header tells the API which region serves the stream
+    responses = write_client.append_rows(
+        iter([request]),
+        metadata=(("x-goog-request-params", f"write_stream={stream_name}"),),
+    )
+    for response in responses:
+        if response.row_errors:
+            messages: Dict[int, List[str]] = {}
+            for row_error in response.row_errors:
+                messages.setdefault(row_error.index, []).append(row_error.message)
+            return [
+                {
+                    "index": index,
+                    "errors": messages.get(index, ["Not written: another row in the append was invalid."]),
+                }
+                for index in range(row_count)
+            ]
+        if response.error.code:
+            raise RuntimeError(f"Storage Write API append failed: {response.error.message}")
+    return []
+
+
+def _insert_rows(
+    client, project_id: str, dataset_id: str, table_id: str, rows: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    Insert rows, preferring the Storage Write API over legacy streaming inserts.
+    
+    Falls back to `insert_rows_json` when USE_STORAGE_WRITE_API is disabled,
+    google-cloud-bigquery-storage is not installed, or the append request
+    cannot be built. Errors raised once the append has been sent propagate
+    instead: the rows may already be written, and resending them through
+    `insert_rows_json` could duplicate them.
+    """
+    if _use_storage_write_api():
+        try:
+            prepared = _build_append_request(project_id, dataset_id, table_id, rows)
+        except Exception:
+            logger.warning("Storage Write API request not built; falling back to insert_rows_json", exc_info=True)
+        else:
+            return _send_append_request(*prepared)
+    return client.insert_rows_json(f"{project_id}.{dataset_id}.{table_id}", rows)
+
+
+def _sample_feature_rows(client, table_ref: str, count: int) -> List[Dict[str, Any]]:
+    """Fetch up to `count` random existing rows' feature values from BigQuery."""
+    query = _SAMPLE_QUERY_TMPL.format(table_ref=table_ref, limit=count)
+    
+    logger.info(f"Fetching {count} random row(s) from {table_ref}")
+    results = list(client.query(query).result())
+    
+    if len(results) < count:
+        # Small tables can sample too few blocks; a full shuffle is cheap there
+        query = _SHUFFLE_QUERY_TMPL.format(table_ref=table_ref, limit=count)
+        results = list(client.query(query).result())
+    
+    return [dict(row) for row in results]
 
 
 def fetch_and_insert_demand_data(
-    target_date: str,
+    target_date: str = "",
     tool_context: Optional[ToolContext] = None,
+    target_dates: Optional[List[str]] = None,
 ) -> Dict[str, Any]:
     """
-    Fetch a random row from BigQuery, copy its feature values, and insert 
-    a new row with PONDS/BLINKIT/Bangalore and the requested date.
+    Fetch random rows from BigQuery, copy their feature values, and insert 
+    new rows with PONDS/BLINKIT/Bangalore for each requested date.
+    
+    All dates are inserted with a single BigQuery streaming insert, so pass
+    every missing date at once via `target_dates` when backfilling.
     
     Args:
         target_date: Date in YYYY-MM-DD format for the new record.
         tool_context: ADK tool context for state management.
+        target_dates: Optional list of dates in YYYY-MM-DD format to insert
+            in one batch. Combined with `target_date` if both are given.
     
     Returns:
-        Dictionary with the fetched features and insertion status.
+        Dictionary with the fetched features and insertion status, including
+        per-date "inserted" and "failed" lists.
     """
-    logger.info(f"fetch_and_insert_demand_data called for date: {target_date}")
+    dates = list(target_dates or [])
+    if target_date and target_date not in dates:
+        dates.insert(0, target_date)
     
-    # Validate date
-    try:
-        parsed_date = date.fromisoformat(target_date)
-    except ValueError:
-        return {"success": False, "error": f"Invalid date format: {target_date}. Use YYYY-MM-DD."}
+    logger.info(f"fetch_and_insert_demand_data called for dates: {dates}")
+    
+    if not dates:
+        return {"success": False, "error": "No target date provided. Use YYYY-MM-DD."}
     
-    # Check date is not in future
-    if parsed_date > date.today():
+    # Validate dates
+    today = date.today()
+    valid_dates = []
+    failed = []
+    for target in dates:
+        try:
+            parsed_date = date.fromisoformat(target)
+        except ValueError:
+            failed.append({"date": target, "error": f"Invalid date format: {target}. Use YYYY-MM-DD."})
+            continue
+        
+        # Check date is not in future
+        if parsed_date > today:
+            failed.append({
+                "date": target,
+                "error": f"Cannot insert data for future date {target}. Today is {today.isoformat()}.",
+            })
+            continue
+        
+        valid_dates.append(target)
+    
+    if not valid_dates:
         return {
-            "success": False, 
-            "error": f"Cannot insert data for future date {target_date}. Today is {date.today().isoformat()}."
+            "success": False,
+            "error": failed[0]["error"] if len(failed) == 1 else "No valid dates to insert.",
+            "inserted": [],
+            "failed": failed,
         }
     
     project_id = os.getenv("BQ_COMPUTE_PROJECT_ID")
@@ -103,50 +382,63 @@ def fetch_and_insert_demand_data(
     table_ref = f"{project_id}.{dataset_id}.{table_id}"
     
     try:
-        client = bigquery.Client(project=project_id)
-        
-        # Step 1: Fetch ONE random row from BigQuery
-        feature_cols_str = ", ".join(FEATURE_COLUMNS)
-        query = f"""
-            SELECT {feature_cols_str}
-            FROM `{table_ref}`
-            ORDER BY RAND()
-            LIMIT 1
-        """
+        client = _get_bq_client(project_id)
         
-        logger.info(f"Fetching random row from {table_ref}")
-        query_job = client.query(query)
-        results = list(query_job.result())
+        # Step 1: Fetch random rows from BigQuery (reusing a recent single-row sample)
+        cache_key = (project_id, dataset_id, table_id)
+        cached_row = _get_cached_feature_row(cache_key) if len(valid_dates) == 1 else None
+        if cached_row is not None:
+            logger.info(f"Reusing cached feature row for {table_ref}")
+            random_rows = [cached_row]
+        else:
+            random_rows = _sample_feature_rows(client, table_ref, len(valid_dates))
+            if not random_rows:
+                return {"success": False, "error": "No existing data in BigQuery to copy from."}
+            logger.info(f"Fetched {len(random_rows)} random row(s) with {len(random_rows[0])} features")
+            _cache_feature_row(cache_key, random_rows[0])
         
-        if not results:
-            return {"success": False, "error": "No existing data in BigQuery to copy from."}
+        # Step 2: Build new rows with fixed identifiers + requested date + random features
+        new_rows = []
+        row_features = []
+        for idx, target in enumerate(valid_dates):
+            # Tables smaller than the batch reuse sampled rows round-robin
+            random_row = random_rows[idx % len(random_rows)]
+            new_row = _ROW_IDENTIFIERS.copy()
+            new_row["date_consensus"] = target
+            
+            # The sample query selects exactly FEATURE_COLUMNS, so copy them all
+            new_row.update(random_row)
+            
+            new_rows.append(new_row)
+            row_features.append(random_row)
         
-        random_row = dict(results[0])
-        logger.info(f"Fetched random row with {len(random_row)} features")
-        
-        # Step 2: Build new row with fixed identifiers + requested date + random features
-        new_row = {
-            "product_id": PRODUCT_ID,
-            "customer_id": CUSTOMER_ID,
-            "location_id": LOCATION_ID,
-            "date_consensus": target_date,
-        }
-        
-        # Add all feature values from random row
-        for col in FEATURE_COLUMNS:
-            if col in random_row:
-                new_row[col] = random_row[col]
-        
-        # Step 3: Insert new row to BigQuery
-        logger.info(f"Inserting new row for {PRODUCT_ID}/{CUSTOMER_ID}/{LOCATION_ID}/{target_date}")
-        errors = client.insert_rows_json(table_ref, [new_row])
+        # Step 3: Insert all new rows to BigQuery in one request
+        logger.info(f"Inserting {len(new_rows)} new row(s) for {PRODUCT_ID}/{CUSTOMER_ID}/{LOCATION_ID}")
+        errors = _insert_rows(client, project_id, dataset_id, table_id, new_rows)
         
         if errors:
             logger.error(f"BigQuery insert errors: {errors}")
+        
+        # Insert errors are reported per row index
+        error_by_index = {err.get("index"): err.get("errors") for err in errors or []}
+        inserted = []
+        for idx, target in enumerate(valid_dates):
+            if idx in error_by_index:
+                failed.append({
+                    "date": target,
+                    "error": "BigQuery insert failed",
+                    "bq_errors": str(error_by_index[idx]),
+                })
+            else:
+                inserted.append({"date": target, "features": row_features[idx]})
+        
+        if not inserted:
             return {
                 "success": False,
                 "error": "BigQuery insert failed",
                 "bq_errors": str(errors),
+                "inserted": [],
+                "failed": failed,
             }
         
         # Step 4: Store features in context for qualitative description generation
@@ -154,22 +446,27 @@ def fetch_and_insert_demand_data(
             "product_id": PRODUCT_ID,
             "customer_id": CUSTOMER_ID,
             "location_id": LOCATION_ID,
-            "date": target_date,
-            "features": random_row,
+            "date": inserted[-1]["date"],
+            "features": inserted[-1]["features"],
         }
         
         if tool_context:
             tool_context.state["inserted_demand_data"] = feature_data
         
-        return {
+        inserted_dates = ", ".join(item["date"] for item in inserted)
+        result = {
             "success": True,
-            "message": f"Successfully inserted demand driver data for {PRODUCT_ID} at {LOCATION_ID} (customer: {CUSTOMER_ID}) on {target_date}",
+            "message": f"Successfully inserted demand driver data for {PRODUCT_ID} at {LOCATION_ID} (customer: {CUSTOMER_ID}) on {inserted_dates}",
             "product_id": PRODUCT_ID,
             "customer_id": CUSTOMER_ID,
             "location_id": LOCATION_ID,
-            "date": target_date,
-            "features": random_row,
+            "inserted": inserted,
+            "failed": failed,
         }
+        if len(inserted) == 1:
+            result["date"] = inserted[0]["date"]
+            result["features"] = inserted[0]["features"]
+        return result
         
     except Exception as e:
         logger.exception("Error in fetch_and_insert_demand_data")
@@ -14,15 +14,284 @@
 
 """Tools for the ADK Samples Data Science Agent."""
 
+import asyncio
+import contextlib
+import hashlib
+import importlib
 import logging
+import os
+import threading
 
 from google.adk.tools import ToolContext
 from google.adk.tools.agent_tool import AgentTool
+from opentelemetry import trace
 
 # Lazy imports for Agent Engine compatibility
-# Sub-agents are imported inside functions to avoid module-level env var access
+# Sub-agents are imported on first use to avoid module-level env var access
 
 logger = logging.getLogger(__name__)
+# Spans are no-ops unless a tracer provider is configured (see agent.py)
+_tracer = trace.get_tracer(__name__)
+
+# Sub-agent registry: name -> (module, factory, state key for its output).
+# Factories are resolved on first use so no sub-agent module is imported at
+# load time; later lookups are a single dict hit.
+_REGISTRY = {
+    "bigquery": (".sub_agents.bigquery.agent", "get_bigquery_agent", "bigquery_agent_output"),
+    "alloydb": (".sub_agents.alloydb.agent", "get_alloydb_agent", "alloydb_agent_output"),
+    "analytics": (".sub_agents.analytics.agent", "get_analytics_agent", "analytics_agent_output"),
+    "research": (".sub_agents.research.agent", "get_research_agent", "research_agent_output"),
+    "bqml": (".sub_agents.bqml.agent", "get_bqml_agent", "bqml_agent_output"),
+}
+_AGENT_GETTERS: dict = {}
+
+# AgentTool wrappers are built once per sub-agent and reused across calls.
+# Building is synchronous and may happen on any request thread, so a plain
+# threading lock keeps concurrent first calls from building duplicates.
+_AGENT_TOOL_CACHE: dict[str, AgentTool] = {}
+_AGENT_TOOL_LOCK = threading.Lock()
+
+# In-flight sub-agent calls keyed by (invocation, agent, request hash), so
+# identical concurrent calls share one upstream run. Entries are removed as
+# soon as the run finishes, so the map never outgrows the live calls.
+_INFLIGHT: dict[tuple[str, str, str], asyncio.Future] = {}
+
+# Database agents the analytics pipeline can fan out to, in registry naming
+_PIPELINE_DB_AGENTS = ("bigquery", "alloydb")
+
+# Constant pieces of the analytics request; the (possibly large) query
+# results are joined in with a single allocation instead of an f-string.
+_ANALYTICS_PROMPT_PARTS = (
+    "\n  Question to answer: ",
+    "\n\n  Actual data to analyze this question is available in the following"
+    " data\n  tables:\n\n  <BIGQUERY>\n  ",
+    "\n  </BIGQUERY>\n\n  <ALLOYDB>\n  ",
+    "\n  </ALLOYDB>\n\n  ",
+)
+
+# Upper bound (seconds) on each sub-agent call so a stalled backend cannot
+# block the root agent indefinitely. Override with e.g.
+# BIGQUERY_AGENT_TIMEOUT_SECONDS=90.
+_DEFAULT_TIMEOUTS = {
+    "bigquery": 60,
+    "alloydb": 60,
+    "analytics": 120,
+    "research": 90,
+    "bqml": 120,
+}
+_TIMEOUTS = {
+    name: float(os.getenv(f"{name.upper()}_AGENT_TIMEOUT_SECONDS", default))
+    for name, default in _DEFAULT_TIMEOUTS.items()
+}
+
+# Concurrency caps on sub-agent runs per process: one shared cap on top of a
+# cap per agent, since BigQuery and the model backends have separate quotas.
+# Override with MAX_SUBAGENT_CONCURRENCY and e.g.
+# BIGQUERY_AGENT_MAX_CONCURRENCY=8. Waiting for a slot is cheap compared to
+# the retries that follow a quota error. AdkApp serves each request on its
+# own thread and event loop, so the caps are threading semaphores (see
+# _hold_slot) rather than asyncio ones, which are bound to a single loop.
+_DEFAULT_CONCURRENCY = {
+    "bigquery": 4,
+    "alloydb": 4,
+    "analytics": 2,
+    "research": 2,
+    "bqml": 4,
+}
+_GLOBAL_SEM = threading.BoundedSemaphore(
+    int(os.getenv("MAX_SUBAGENT_CONCURRENCY", "8"))
+)
+_AGENT_SEMS = {
+    name: threading.BoundedSemaphore(
+        int(os.getenv(f"{name.upper()}_AGENT_MAX_CONCURRENCY", default))
+    )
+    for name, default in _DEFAULT_CONCURRENCY.items()
+}
+
+# Query results larger than this are cut to their head and tail before being
+# embedded in the analytics request, to bound prompt tokens.
+_MAX_ANALYTICS_DATA_CHARS = int(os.getenv("ANALYTICS_MAX_DATA_CHARS", "16384"))
+
+
+@contextlib.asynccontextmanager
+async def _hold_slot(sem: threading.BoundedSemaphore):
+    """Hold a slot of a process-wide semaphore from any event loop.
+
+    A free slot is taken without leaving the loop; otherwise the wait runs
+    in a worker thread so the loop keeps serving other tasks. If the waiting
+    task is cancelled, the slot is released as soon as the thread gets it.
+    """
+    if not sem.acquire(blocking=False):
+        guard = threading.Lock()
+        state = {"granted": False, "abandoned": False}
+
+        def _wait() -> None:
+            sem.acquire()
+            with guard:
+                if state["abandoned"]:
+                    sem.release()
+                else:
+                    state["granted"] = True
+
+        try:
+            await asyncio.to_thread(_wait)
+        except BaseException:
+            with guard:
+                if state["granted"]:
+                    sem.release()
+                else:
+                    state["abandoned"] = True
+            raise
+    try:
+        yield
+    finally:
+        sem.release()
+
+
+def _summarize_blob(
+    blob: str, state_key: str, max_chars: int = _MAX_ANALYTICS_DATA_CHARS
+) -> str:
+    """Keep the head and tail of a large result blob, noting what was cut."""
+    if len(blob) <= max_chars:
+        return blob
+    half = max_chars // 2
+    return "".join((
+        blob[:half],
+        f"\n...[truncated {len(blob) - 2 * half} chars; the full result is in"
+        f" state key '{state_key}']...\n",
+        blob[-half:],
+    ))
+
+
+def _agent_getter(name: str):
+    """Return the get_*_agent() factory for a sub-agent, importing it lazily.
+
+    Called only under _AGENT_TOOL_LOCK, so _AGENT_GETTERS has one writer.
+    """
+    getter = _AGENT_GETTERS.get(name)
+    if getter is None:
+        module_path, attr, _ = _REGISTRY[name]
+        getter = getattr(importlib.import_module(module_path, __package__), attr)
+        _AGENT_GETTERS[name] = getter
+    return getter
+
+
+def _get_agent_tool(name: str) -> AgentTool:
+    """Return the cached AgentTool for a sub-agent, building it on first use."""
+    agent_tool = _AGENT_TOOL_CACHE.get(name)
+    if agent_tool is None:
+        with _AGENT_TOOL_LOCK:
+            agent_tool = _AGENT_TOOL_CACHE.get(name)
+            if agent_tool is None:
+                agent_tool = AgentTool(agent=_agent_getter(name)())
+                _AGENT_TOOL_CACHE[name] = agent_tool
+    return agent_tool
+
+
+async def warm_up(names: list[str] | None = None) -> None:
+    """Build sub-agents and their AgentTool wrappers ahead of first use.
+
+    Agent construction (module imports, client setup) runs in worker threads
+    so it does not block the event loop. _get_agent_tool and the agent
+    getters take their own locks, so a request arriving mid-build waits for
+    it instead of building a duplicate. Failures are logged and ignored;
+    the agent will simply be built on its first real call instead.
+    """
+    names = list(_REGISTRY) if names is None else names
+
+    results = await asyncio.gather(
+        *(asyncio.to_thread(_get_agent_tool, name) for name in names),
+        return_exceptions=True,
+    )
+    for name, result in zip(names, results):
+        if isinstance(result, Exception):
+            logger.warning("warm_up: %s agent not pre-built: %s", name, result)
+
+
+def _dlog(msg: str, arg: str) -> None:
+    """Debug-log a tool argument, truncated, only when DEBUG is enabled."""
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(msg, arg if len(arg) < 512 else arg[:512] + "...")
+
+
+def _publish_state(tool_context: ToolContext, key: str, value) -> None:
+    """Write a sub-agent output back into the session state.
+
+    ADK buffers state changes in memory and persists them with the tool's
+    response event, so this is a local dict write, not a backend round trip.
+    It must also happen before the tool returns: a write scheduled to run
+    later could miss the event and be silently dropped.
+    """
+    tool_context.state[key] = value
+
+
+async def _run_agent_tool(
+    name: str,
+    agent_tool: AgentTool,
+    request: str,
+    tool_context: ToolContext,
+):
+    """Run a sub-agent with its timeout; returns a failure dict on timeout.
+
+    Identical requests to the same sub-agent issued concurrently within one
+    invocation share a single run. The key is scoped to the invocation so
+    sub-agent state updates always land in the session that asked for them.
+    The run waits for a per-agent and a global concurrency slot first; the
+    timeout covers only the run itself.
+    """
+    key = (
+        tool_context.invocation_id,
+        name,
+        hashlib.blake2b(request.encode(), digest_size=16).hexdigest(),
+    )
+    inflight = _INFLIGHT.get(key)
+    if inflight is not None:
+        _dlog(f"{name} agent: joining in-flight call for %s", request)
+        return await asyncio.shield(inflight)
+
+    future = asyncio.get_running_loop().create_future()
+    _INFLIGHT[key] = future
+    try:
+        with _tracer.start_as_current_span(f"call_{name}_agent") as span:
+            span.set_attribute("agent.name", name)
+            span.set_attribute("request.len", len(request))
+            try:
+                async with _hold_slot(_AGENT_SEMS[name]), _hold_slot(_GLOBAL_SEM):
+                    output = await asyncio.wait_for(
+                        agent_tool.run_async(args={"request": request}, tool_context=tool_context),
+                        timeout=_TIMEOUTS[name],
+                    )
+            except asyncio.TimeoutError:
+                logger.warning("%s agent timed out after %ss", name, _TIMEOUTS[name])
+                span.set_attribute("agent.timed_out", True)
+                output = {
+                    "status": "timeout",
+                    "agent": name,
+                    "error": f"The {name} agent did not respond within {_TIMEOUTS[name]:.0f} seconds.",
+                }
+            else:
+                if span.is_recording():
+                    span.set_attribute("output.len", len(str(output)))
+        future.set_result(output)
+        return output
+    except BaseException as e:
+        future.set_exception(e)
+        future.exception()  # mark retrieved when no other caller is waiting
+        raise
+    finally:
+        _INFLIGHT.pop(key, None)
+
+
+async def _dispatch(name: str, request: str, tool_context: ToolContext):
+    """Run a registered sub-agent and write its output back into state.
+
+    Shared path for every call_*_agent tool: cached AgentTool, timeout,
+    single-flight de-duplication and state write-back.
+    """
+    agent_tool = _get_agent_tool(name)
+    output = await _run_agent_tool(name, agent_tool, request, tool_context)
+    _publish_state(tool_context, _REGISTRY[name][2], output)
+    return output
 
 
 async def call_bigquery_agent(
@@ -30,17 +299,8 @@ async def call_bigquery_agent(
     tool_context: ToolContext,
 ):
     """Tool to call bigquery database (nl2sql) agent."""
-    logger.debug("call_bigquery_agent: %s", question)
-
-    # Lazy import to support Agent Engine deployment
-    from .sub_agents.bigquery.agent import get_bigquery_agent
-    agent_tool = AgentTool(agent=get_bigquery_agent())
-
-    bigquery_agent_output = await agent_tool.run_async(
-        args={"request": question}, tool_context=tool_context
-    )
-    tool_context.state["bigquery_agent_output"] = bigquery_agent_output
-    return bigquery_agent_output
+    _dlog("call_bigquery_agent: %s", question)
+    return await _dispatch("bigquery", question, tool_context)
 
 
 async def call_alloydb_agent(
@@ -48,17 +308,35 @@ async def call_alloydb_agent(
     tool_context: ToolContext,
 ):
     """Tool to call alloydb database (nl2sql) agent."""
-    logger.debug("call_alloydb_agent: %s", question)
+    _dlog("call_alloydb_agent: %s", question)
+    return await _dispatch("alloydb", question, tool_context)
+
+
+async def _fan_out(names, question: str, tool_context: ToolContext) -> dict:
+    """Run the named DB agents concurrently on the same question.
+
+    Outputs are written to the tool context state only after every call has
+    finished; a failed agent yields an "Error: ..." string instead of raising.
+    """
 
-    # Lazy import to support Agent Engine deployment
-    from .sub_agents.alloydb.agent import get_alloydb_agent
-    agent_tool = AgentTool(agent=get_alloydb_agent())
+    async def _run(name):
+        agent_tool = _get_agent_tool(name)
+        return await _run_agent_tool(name, agent_tool, question, tool_context)
 
-    alloydb_agent_output = await agent_tool.run_async(
-        args={"request": question}, tool_context=tool_context
+    results = await asyncio.gather(
+        *(_run(name) for name in names), return_exceptions=True
     )
-    tool_context.state["alloydb_agent_output"] = alloydb_agent_output
-    return alloydb_agent_output
+
+    outputs = {}
+    for name, output in zip(names, results):
+        key = _REGISTRY[name][2]
+        if isinstance(output, Exception):
+            logger.warning("%s agent failed: %s", name, output)
+            output = f"Error: {output}"
+        else:
+            _publish_state(tool_context, key, output)
+        outputs[key] = output
+    return outputs
 
 
 async def call_analytics_agent(
@@ -82,7 +360,9 @@ async def call_analytics_agent(
     * pandas
 
     The tool DOES NOT have the ability to retrieve additional data from
-    a database. Only the data already retrieved will be analyzed.
+    a database. Only the data already retrieved will be analyzed. If no
+    query results have been retrieved yet, it returns a "no_data" status
+    without running any analysis, so call a database agent first.
 
     Args:
         question (str): Natural language question or analytics request.
@@ -93,44 +373,63 @@ async def call_analytics_agent(
         Response from the analytics agent.
 
     """
-    logger.debug("call_analytics_agent: %s", question)
+    _dlog("call_analytics_agent: %s", question)
 
     # if question == "N/A":
     #    return tool_context.state["db_agent_output"]
 
-    bigquery_data = ""
-    alloydb_data = ""
+    bigquery_data = tool_context.state.get("bigquery_query_result", "")
+    alloydb_data = tool_context.state.get("alloydb_query_result", "")
+
+    if not bigquery_data and not alloydb_data:
+        return {
+            "status": "no_data",
+            "message": "No query results available; run a DB agent first.",
+        }
 
-    if "bigquery_query_result" in tool_context.state:
-        bigquery_data = tool_context.state["bigquery_query_result"]
-    if "alloydb_query_result" in tool_context.state:
-        alloydb_data = tool_context.state["alloydb_query_result"]
+    question_with_data = "".join((
+        _ANALYTICS_PROMPT_PARTS[0], question,
+        _ANALYTICS_PROMPT_PARTS[1],
+        _summarize_blob(str(bigquery_data), "bigquery_query_result"),
+        _ANALYTICS_PROMPT_PARTS[2],
+        _summarize_blob(str(alloydb_data), "alloydb_query_result"),
+        _ANALYTICS_PROMPT_PARTS[3],
+    ))
 
-    question_with_data = f"""
-  Question to answer: {question}
+    return await _dispatch("analytics", question_with_data, tool_context)
 
-  Actual data to analyze this question is available in the following data
-  tables:
 
-  <BIGQUERY>
-  {bigquery_data}
-  </BIGQUERY>
+async def call_analytics_pipeline(
+    db_question: str,
+    analytics_question: str,
+    tool_context: ToolContext,
+):
+    """
+    Tool to retrieve data and analyze it in a single call.
+
+    Queries every configured database agent concurrently with `db_question`,
+    then runs the analytics agent on `analytics_question` over the retrieved
+    results. Use it instead of a DB agent call followed by
+    `call_analytics_agent` when both steps are already known.
 
-  <ALLOYDB>
-  {alloydb_data}
-  </ALLOYDB>
+    Args:
+        db_question (str): Natural language question for the database agents.
+        analytics_question (str): Analytics request to run on the results.
+        tool_context (ToolContext): The tool context for state management.
 
-  """
+    Returns:
+        Outputs of the database agents and the analytics agent.
+    """
+    _dlog("call_analytics_pipeline: %s", db_question)
 
-    # Lazy import to support Agent Engine deployment
-    from .sub_agents.analytics.agent import get_analytics_agent
-    agent_tool = AgentTool(agent=get_analytics_agent())
+    configured = tool_context.state.get("database_settings") or {}
+    names = [name for name in _PIPELINE_DB_AGENTS if name in configured]
+    outputs = await _fan_out(names or ["bigquery"], db_question, tool_context)
 
-    analytics_agent_output = await agent_tool.run_async(
-        args={"request": question_with_data}, tool_context=tool_context
+    outputs["analytics_agent_output"] = await call_analytics_agent(
+        analytics_question, tool_context
     )
-    tool_context.state["analytics_agent_output"] = analytics_agent_output
-    return analytics_agent_output
+    return outputs
 
 
 async def call_research_agent(
@@ -156,24 +455,17 @@ async def call_research_agent(
     Returns:
         Response including qualitative description and feature values.
     """
-    logger.debug("call_research_agent: %s", request)
-
-    # Lazy import to support Agent Engine deployment
-    from .sub_agents.research.agent import research_agent
-    agent_tool = AgentTool(agent=research_agent)
-
-    research_agent_output = await agent_tool.run_async(
-        args={"request": request}, tool_context=tool_context
-    )
-    tool_context.state["research_agent_output"] = research_agent_output
-    
-    # Extract qualitative description for Root Agent to display
-    if "qualitative_description" in tool_context.state:
-        logger.debug("Qualitative description available for display")
+    _dlog("call_research_agent: %s", request)
+    research_agent_output = await _dispatch("research", request, tool_context)
     
-    # Extract inserted data features for Root Agent
-    if "inserted_demand_data" in tool_context.state:
-        logger.debug("Inserted demand data features available")
+    if logger.isEnabledFor(logging.DEBUG):
+        # Extract qualitative description for Root Agent to display
+        if "qualitative_description" in tool_context.state:
+            logger.debug("Qualitative description available for display")
+
+        # Extract inserted data features for Root Agent
+        if "inserted_demand_data" in tool_context.state:
+            logger.debug("Inserted demand data features available")
     
     return research_agent_output
 
@@ -204,14 +496,5 @@ async def call_bqml_agent(
     Returns:
         Response with prediction results or BQML operation outcome.
     """
-    logger.debug("call_bqml_agent: %s", request)
-
-    # Lazy import to support Agent Engine deployment
-    from .sub_agents.bqml.agent import get_bqml_agent
-    agent_tool = AgentTool(agent=get_bqml_agent())
-
-    bqml_agent_output = await agent_tool.run_async(
-        args={"request": request}, tool_context=tool_context
-    )
-    tool_context.state["bqml_agent_output"] = bqml_agent_output
-    return bqml_agent_output
+    _dlog("call_bqml_agent: %s", request)
+    return await _dispatch("bqml", request, tool_context)
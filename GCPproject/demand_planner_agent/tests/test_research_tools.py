@@ -0,0 +1,121 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the Research Agent's BigQuery insert path."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from data_science.sub_agents.research import tools
+
+ROWS = [{"product_id": "PONDS", "date_consensus": "2025-01-01"}]
+
+
+class FakeClient:
+    """Records legacy streaming inserts."""
+
+    def __init__(self):
+        self.inserted = []
+
+    def insert_rows_json(self, table_ref, rows):
+        self.inserted.append((table_ref, rows))
+        return []
+
+
+class FakeWriteClient:
+    """Answers every append with the given row errors."""
+
+    def __init__(self, row_errors):
+        self.row_errors = row_errors
+
+    def append_rows(self, requests, metadata=()):
+        list(requests)
+        yield SimpleNamespace(row_errors=self.row_errors, error=SimpleNamespace(code=0))
+
+
+def append_request(row_count):
+    rows = SimpleNamespace(serialized_rows=[b""] * row_count)
+    return SimpleNamespace(proto_rows=SimpleNamespace(rows=rows))
+
+
+@pytest.fixture(autouse=True)
+def storage_write_enabled(monkeypatch):
+    monkeypatch.setattr(tools, "_use_storage_write_api", lambda: True)
+
+
+def test_falls_back_when_append_request_cannot_be_built(monkeypatch):
+    def fail_build(*args):
+        raise ValueError("Unsupported column for Storage Write API")
+
+    monkeypatch.setattr(tools, "_build_append_request", fail_build)
+    client = FakeClient()
+
+    errors = tools._insert_rows(client, "proj", "ds", "tbl", ROWS)
+
+    assert errors == []
+    assert client.inserted == [("proj.ds.tbl", ROWS)]
+
+
+def test_does_not_resend_rows_when_sent_append_fails(monkeypatch):
+    def fail_send(*args):
+        raise RuntimeError("Storage Write API append failed: deadline exceeded")
+
+    monkeypatch.setattr(
+        tools, "_build_append_request", lambda *args: ("client", "stream", "request")
+    )
+    monkeypatch.setattr(tools, "_send_append_request", fail_send)
+    client = FakeClient()
+
+    with pytest.raises(RuntimeError):
+        tools._insert_rows(client, "proj", "ds", "tbl", ROWS)
+    assert client.inserted == []
+
+
+def test_returns_row_errors_from_sent_append(monkeypatch):
+    row_errors = [{"index": 0, "errors": ["invalid value"]}]
+    monkeypatch.setattr(
+        tools, "_build_append_request", lambda *args: ("client", "stream", "request")
+    )
+    monkeypatch.setattr(tools, "_send_append_request", lambda *args: row_errors)
+    client = FakeClient()
+
+    assert tools._insert_rows(client, "proj", "ds", "tbl", ROWS) == row_errors
+    assert client.inserted == []
+
+
+def test_row_error_fails_every_date_in_the_append(monkeypatch):
+    # A default-stream append with one bad row writes none of its rows
+    row_errors = [SimpleNamespace(index=1, message="invalid value")]
+    monkeypatch.setenv("BQ_COMPUTE_PROJECT_ID", "proj")
+    monkeypatch.setenv("BQ_DATASET_ID", "ds")
+    monkeypatch.setattr(tools, "_get_bq_client", lambda project_id: FakeClient())
+    monkeypatch.setattr(
+        tools, "_sample_feature_rows",
+        lambda client, table_ref, count: [{"pdp_views": 120.0}] * count,
+    )
+    monkeypatch.setattr(
+        tools, "_build_append_request",
+        lambda *args: (FakeWriteClient(row_errors), "stream", append_request(2)),
+    )
+
+    result = tools.fetch_and_insert_demand_data(
+        target_dates=["2025-01-01", "2025-01-02"]
+    )
+
+    assert result["success"] is False
+    assert result["inserted"] == []
+    failed = {item["date"]: item["bq_errors"] for item in result["failed"]}
+    assert set(failed) == {"2025-01-01", "2025-01-02"}
+    assert "invalid value" in failed["2025-01-02"]
@@ -6,9 +6,32 @@ Uses SSE streaming to show intermediate agent calls
 import streamlit as st
 import requests
 import json
+import mimetypes
 import base64
+import hashlib
+import html
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-import re
+import time
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# google-auth ships with google-cloud-storage; used for access tokens
+try:
+    import google.auth
+    from google.auth.transport.requests import Request as GoogleAuthRequest
+    GOOGLE_AUTH_AVAILABLE = True
+except ImportError:
+    GOOGLE_AUTH_AVAILABLE = False
+
+# orjson parses stream lines and artifacts faster; stdlib json is the fallback.
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so handlers are shared.
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
 
 # Try to import GCS client for fetching images from Cloud Storage
 try:
@@ -25,7 +48,7 @@ except ImportError:
 )
 
 # Dark theme CSS matching ADK Web
-st.markdown("""
+APP_CSS = """
 <style>
     .stApp {
         background-color: #0d1117;
@@ -115,11 +138,14 @@ st.markdown("""
         border-color: #58a6ff;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# Streamlit drops elements a rerun does not emit again, so the stylesheet is
+# sent on every run; collapsing whitespace keeps that payload small.
+st.markdown(" ".join(APP_CSS.split()), unsafe_allow_html=True)
 
 # Backend URL - defaults to local, can be overridden by environment variable
 import os
-import subprocess
 
 BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8000")
 
@@ -132,47 +158,199 @@ AGENT_ENGINE_URL = f"https://{GCP_REGION}-aiplatform.googleapis.com/v1/projects/
 # Use Agent Engine instead of local backend
 USE_AGENT_ENGINE = os.getenv("USE_AGENT_ENGINE", "true").lower() == "true"
 
+# OAuth scope for Agent Engine calls with Application Default Credentials
+GCP_AUTH_SCOPE = "https://www.googleapis.com/auth/cloud-platform"
+
+# File extensions treated as images
+_IMG_EXTS = (".png", ".jpg", ".jpeg", ".gif", ".webp")
+
+# Right-aligned bubble for the user's (HTML-escaped) message
+USER_MSG_TEMPLATE = '<div style="text-align: right;"><div class="user-message">{}</div></div>'
+
+# Minimum time between progress re-renders while a response streams in
+STREAM_UPDATE_INTERVAL_SECONDS = 0.3
+
+# Parallel HEAD probes when looking for new Code Interpreter artifacts
+ARTIFACT_PROBE_WORKERS = 32
+
+# Highest artifact version probed for (versions are numbered from 0)
+ARTIFACT_MAX_VERSION = 20
+
+# Chart images are written here and served by Streamlit's static file server
+# (server.enableStaticServing), so reruns send a short URL instead of the
+# image bytes. st.image accepts /app/static URLs from Streamlit 1.56.
+STATIC_CHARTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "charts")
+STATIC_IMAGES_ENABLED = tuple(int(x) for x in st.__version__.split(".")[:2]) >= (1, 56)
+
+# Chart files kept on disk: after each new write, files unused for longer
+# than the max age are removed, then the oldest beyond the count cap
+MAX_STATIC_CHARTS = 500
+STATIC_CHART_MAX_AGE_SECONDS = 24 * 60 * 60
+
+# Artifact keys remembered as shown; older versions are never re-probed
+# (see known_versions), so evicting old keys cannot re-show a chart
+MAX_SHOWN_ARTIFACTS = 256
+
+# Artifact responses smaller than this are empty placeholders; larger than
+# MAX_ARTIFACT_BYTES are not downloaded
+MIN_ARTIFACT_BYTES = 200
+MAX_ARTIFACT_BYTES = 16 * 1024 * 1024
+
+@st.cache_resource
+def get_http_session():
+    """Keep-alive HTTP session shared across reruns, so TLS connections are reused."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=ARTIFACT_PROBE_WORKERS,
+        pool_maxsize=ARTIFACT_PROBE_WORKERS,
+        max_retries=Retry(total=2, backoff_factor=0.2)
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+_HTTP = get_http_session()
+
+@st.cache_resource
+def get_background_pool():
+    """Small thread pool for work overlapped with the main request path."""
+    return ThreadPoolExecutor(max_workers=4)
+
+@st.cache_resource
+def get_gcp_credentials():
+    """Application Default Credentials, loaded once and shared across reruns."""
+    credentials, _ = google.auth.default(scopes=[GCP_AUTH_SCOPE])
+    return credentials
+
 def get_gcp_access_token():
-    """Get GCP access token using gcloud CLI."""
+    """Get a GCP access token in-process, refreshing it only when expired."""
+    if not GOOGLE_AUTH_AVAILABLE:
+        return ""
     try:
-        result = subprocess.run(
-            ["gcloud", "auth", "print-access-token"],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        return result.stdout.strip()
-    except subprocess.CalledProcessError:
+        credentials = get_gcp_credentials()
+        if not credentials.valid:
+            credentials.refresh(GoogleAuthRequest())
+        return credentials.token
+    except Exception:
         return ""
 
+def _invalidate_token(response):
+    """Force a token refresh on the next call if Agent Engine rejected it."""
+    if response.status_code == 401 and GOOGLE_AUTH_AVAILABLE:
+        get_gcp_credentials().token = None
+
+@st.cache_resource
+def get_gcs_client():
+    """GCS client built once and shared across reruns."""
+    return storage.Client()
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def download_gcs_blob(bucket_name: str, blob_name: str) -> bytes:
+    """Download a GCS object, cached across reruns (failures are not cached)."""
+    client = get_gcs_client()
+    bucket = client.bucket(bucket_name)
+    blob = bucket.blob(blob_name)
+    
+    return blob.download_as_bytes()
+
 def fetch_gcs_image(gcs_uri: str):
     """Fetch image from Google Cloud Storage URI."""
     if not GCS_AVAILABLE:
         return None
     
+    # Parse gs://bucket/blob without a regex; other schemes are skipped
+    if not gcs_uri.startswith("gs://"):
+        return None
+    bucket_name, _, blob_name = gcs_uri[5:].partition("/")
+    if not bucket_name or not blob_name:
+        return None
+    
     try:
-        # Parse gs:// URI
-        match = re.match(r'gs://([^/]+)/(.+)', gcs_uri)
-        if not match:
-            return None
-        
-        bucket_name, blob_name = match.groups()
-        client = storage.Client()
-        bucket = client.bucket(bucket_name)
-        blob = bucket.blob(blob_name)
-        
-        return blob.download_as_bytes()
+        return download_gcs_blob(bucket_name, blob_name)
     except Exception as e:
         st.warning(f"Could not fetch image from GCS: {e}")
         return None
 
+def decode_base64(data):
+    """Decode standard or URL-safe base64, tolerating missing padding."""
+    if isinstance(data, str):
+        data = data.encode("ascii")
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+def prune_static_charts():
+    """Remove chart files past the max age, then the oldest beyond the cap."""
+    cutoff = time.time() - STATIC_CHART_MAX_AGE_SECONDS
+    kept = []
+    try:
+        with os.scandir(STATIC_CHARTS_DIR) as entries:
+            for entry in entries:
+                try:
+                    mtime = entry.stat().st_mtime
+                    if mtime < cutoff:
+                        os.remove(entry.path)
+                    else:
+                        kept.append((mtime, entry.path))
+                except OSError:
+                    pass  # removed concurrently by another session
+    except OSError:
+        return
+    kept.sort()
+    for _, path in kept[:-MAX_STATIC_CHARTS]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def save_static_image(image_bytes: bytes, mime_type: str = "image/png"):
+    """Write image bytes under static/ and return their /app/static URL.
+    
+    Files are named by content hash, so each image is written once; reuse
+    refreshes the file's mtime so prune_static_charts keeps it. Returns None
+    when static serving is unavailable or the write fails.
+    """
+    if not STATIC_IMAGES_ENABLED or not st.get_option("server.enableStaticServing"):
+        return None
+    name = hashlib.blake2b(image_bytes, digest_size=8).hexdigest() + (mimetypes.guess_extension(mime_type) or ".png")
+    path = os.path.join(STATIC_CHARTS_DIR, name)
+    try:
+        if os.path.exists(path):
+            os.utime(path)
+        else:
+            os.makedirs(STATIC_CHARTS_DIR, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(image_bytes)
+            os.replace(tmp_path, path)
+            prune_static_charts()
+    except OSError:
+        return None
+    return f"/app/static/charts/{name}"
+
+def show_image(image_bytes: bytes, holder: dict, mime_type: str = "image/png", **kwargs):
+    """st.image that sends a static URL instead of the bytes when it can.
+    
+    The URL is remembered on holder (the message's image or artifact dict),
+    so later reruns neither hash nor re-upload the image. A URL whose file
+    has since been pruned is written again.
+    """
+    url = holder.get("static_url")
+    if url is not None and not os.path.exists(os.path.join(STATIC_CHARTS_DIR, url.rsplit("/", 1)[-1])):
+        url = None
+    if url is None:
+        url = save_static_image(image_bytes, mime_type)
+        if url:
+            holder["static_url"] = url
+    st.image(url or image_bytes, **kwargs)
+
 def display_image(img_data: dict):
     """Display an image from various formats."""
     try:
-        if "data" in img_data and img_data["data"]:
-            # Base64 encoded image
-            image_bytes = base64.b64decode(img_data["data"])
-            st.image(image_bytes, use_container_width=True)
+        image_bytes = img_data.get("decoded")
+        if image_bytes is None and img_data.get("data"):
+            # Base64 encoded image, decoded on first display only
+            image_bytes = img_data["decoded"] = decode_base64(img_data["data"])
+        if image_bytes:
+            show_image(image_bytes, img_data, img_data.get("mime_type", "image/png"), use_container_width=True)
             return True
     except Exception as e:
         pass
@@ -189,14 +367,30 @@ def display_gcs_image(uri: str):
         st.markdown(f"📊 [View Chart]({uri})")
         return False
 
-def fetch_session_artifacts(session_id: str, already_shown: set = None):
-    """Fetch only NEW artifacts (not previously shown) from the ADK session."""
+def fetch_session_artifacts(session_id: str, already_shown: set = None, known_versions: dict = None):
+    """Fetch only NEW artifacts (not previously shown) from the ADK session.
+    
+    Pass known_versions explicitly when calling from a background thread,
+    where st.session_state is not available.
+    """
     if already_shown is None:
         already_shown = set()
     
+    artifacts_url = f"{BACKEND_URL}/apps/data_science/users/user/sessions/{session_id}/artifacts"
     artifacts = []
     fetched_names = set()
     
+    def probe_version(artifact_name: str, version: int):
+        """HEAD-probe one artifact version; returns (exists, Content-Length or None)."""
+        try:
+            response = _HTTP.head(f"{artifacts_url}/{artifact_name}/versions/{version}", timeout=2)
+        except requests.RequestException:
+            return False, None
+        if response.status_code != 200:
+            return False, None
+        length = response.headers.get("Content-Length")
+        return True, int(length) if length and length.isdigit() else None
+    
     def try_fetch_artifact(artifact_name: str, version: str):
         """Try to fetch a specific artifact version."""
         artifact_key = f"{artifact_name}:v{version}"
@@ -206,24 +400,21 @@ def fetch_session_artifacts(session_id: str, already_shown: set = None):
             return None
         
         try:
-            artifact_url = f"{BACKEND_URL}/apps/data_science/users/user/sessions/{session_id}/artifacts/{artifact_name}/versions/{version}"
-            artifact_response = requests.get(artifact_url, timeout=10)
+            artifact_url = f"{artifacts_url}/{artifact_name}/versions/{version}"
+            with _HTTP.get(artifact_url, timeout=10, stream=True) as artifact_response:
+                if artifact_response.status_code != 200:
+                    return None
+                # Read at most MAX_ARTIFACT_BYTES; larger payloads are dropped
+                body = artifact_response.raw.read(MAX_ARTIFACT_BYTES + 1, decode_content=True)
             
-            if artifact_response.status_code == 200:
+            if len(body) <= MAX_ARTIFACT_BYTES:
                 try:
-                    artifact_json = artifact_response.json()
+                    artifact_json = json_loads(body)
                     inline_data = artifact_json.get("inlineData", {})
                     
                     if "data" in inline_data:
-                        b64_data = inline_data["data"]
-                        b64_standard = b64_data.replace('-', '+').replace('_', '/')
-                        
-                        padding_needed = len(b64_standard) % 4
-                        if padding_needed:
-                            b64_standard += "=" * (4 - padding_needed)
-                        
                         try:
-                            image_data = base64.b64decode(b64_standard)
+                            image_data = decode_base64(inline_data["data"])
                         except Exception:
                             return None
                         
@@ -244,69 +435,94 @@ def fetch_session_artifacts(session_id: str, already_shown: set = None):
             pass
         return None
     
+    # Highest version seen so far per artifact in this session. ADK numbers
+    # versions contiguously from v0, so when the next version after it is
+    # missing the artifact has nothing new and its other versions need no probe.
+    if known_versions is None:
+        known_versions = st.session_state.setdefault("artifact_versions", {}).setdefault(session_id, {})
+    
+    def probe_all(candidates):
+        """HEAD-probe (artifact, version) pairs concurrently."""
+        return zip(candidates, pool.map(lambda c: probe_version(*c), candidates))
+    
     try:
-        # Find the LATEST version of each artifact (most recently created)
-        for i in range(1, 10):
-            artifact_name = f"code_execution_image_{i}.png"
+        with ThreadPoolExecutor(max_workers=ARTIFACT_PROBE_WORKERS) as pool:
+            # First wave: only the next unseen version of each artifact
+            next_versions = [
+                (f"code_execution_image_{i}.png", known_versions.get(f"code_execution_image_{i}.png", -1) + 1)
+                for i in range(1, 10)
+            ]
+            highest_versions = {}
+            for (artifact_name, version), (found, length) in probe_all(
+                [c for c in next_versions if c[1] <= ARTIFACT_MAX_VERSION]
+            ):
+                if found:
+                    highest_versions[artifact_name] = (version, length)
             
-            # Find highest available version for this artifact
-            highest_version = None
-            for version in range(20, -1, -1):  # Check from high to low
-                artifact_key = f"{artifact_name}:v{version}"
-                if artifact_key in already_shown:
-                    continue  # Skip already shown versions
-                    
-                try:
-                    artifact_url = f"{BACKEND_URL}/apps/data_science/users/user/sessions/{session_id}/artifacts/{artifact_name}/versions/{version}"
-                    check_response = requests.head(artifact_url, timeout=2)
-                    if check_response.status_code == 200:
-                        highest_version = str(version)
-                        break
-                except:
-                    continue
+            # Find the LATEST version of each artifact that has new versions
+            later_versions = [
+                (artifact_name, version)
+                for artifact_name, (first_new, _) in highest_versions.items()
+                for version in range(first_new + 1, ARTIFACT_MAX_VERSION + 1)
+            ]
+            for (artifact_name, version), (found, length) in probe_all(later_versions):
+                if found and version > highest_versions[artifact_name][0]:
+                    highest_versions[artifact_name] = (version, length)
             
-            # Fetch the highest version if found and not already shown
-            if highest_version is not None:
-                artifact = try_fetch_artifact(artifact_name, highest_version)
-                if artifact:
-                    artifacts.append(artifact)
-                    
+            for artifact_name, (version, _) in highest_versions.items():
+                known_versions[artifact_name] = version
+            
+            # Last wave: fetch just the highest version of each artifact,
+            # skipping placeholders the HEAD response already shows are empty
+            to_fetch = [
+                (artifact_name, version)
+                for artifact_name, (version, length) in highest_versions.items()
+                if length is None or length >= MIN_ARTIFACT_BYTES
+            ]
+            results = pool.map(
+                lambda item: try_fetch_artifact(item[0], str(item[1])),
+                to_fetch
+            )
+            artifacts = [artifact for artifact in results if artifact]
     except Exception:
         pass
     
     return artifacts
 
 def find_artifact_names(obj, found=None):
-    """Recursively find artifact names in session data."""
+    """Find artifact names in session data."""
     if found is None:
         found = set()
     
-    if isinstance(obj, dict):
-        # Look for artifact references
-        if "artifact" in obj:
-            artifact = obj["artifact"]
-            if isinstance(artifact, dict) and "name" in artifact:
-                found.add(artifact["name"])
-            elif isinstance(artifact, str):
-                found.add(artifact)
-        
-        # Look for file names that look like artifacts
-        if "filename" in obj:
-            filename = obj["filename"]
-            if isinstance(filename, str) and (".png" in filename or ".jpg" in filename):
-                found.add(filename)
-        
-        # Look for name fields with image extensions
-        if "name" in obj:
-            name = obj["name"]
-            if isinstance(name, str) and ("image" in name.lower() or ".png" in name or ".jpg" in name):
-                found.add(name)
-        
-        for v in obj.values():
-            find_artifact_names(v, found)
-    elif isinstance(obj, list):
-        for item in obj:
-            find_artifact_names(item, found)
+    stack = deque([obj])
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, dict):
+            # Look for artifact references
+            if "artifact" in obj:
+                artifact = obj["artifact"]
+                if isinstance(artifact, dict) and "name" in artifact:
+                    found.add(artifact["name"])
+                elif isinstance(artifact, str):
+                    found.add(artifact)
+            
+            # Look for file names that look like artifacts
+            if "filename" in obj:
+                filename = obj["filename"]
+                if isinstance(filename, str) and filename.lower().endswith(_IMG_EXTS):
+                    found.add(filename)
+            
+            # Look for name fields with image extensions
+            if "name" in obj:
+                name = obj["name"]
+                if isinstance(name, str):
+                    name_lower = name.lower()
+                    if "image" in name_lower or name_lower.endswith(_IMG_EXTS):
+                        found.add(name)
+            
+            stack.extend(obj.values())
+        elif isinstance(obj, list):
+            stack.extend(obj)
     
     return list(found)
 
@@ -318,7 +534,7 @@ if "session_id" not in st.session_state:
 if "quick_action" not in st.session_state:
     st.session_state.quick_action = None
 if "shown_artifacts" not in st.session_state:
-    st.session_state.shown_artifacts = set()  # Track artifacts already displayed
+    st.session_state.shown_artifacts = OrderedDict()  # Artifacts already displayed, oldest first
 
 def create_session():
     """Create a new session with Agent Engine or ADK backend."""
@@ -326,10 +542,10 @@ def create_session():
         try:
             token = get_gcp_access_token()
             if not token:
-                st.error("Failed to get GCP access token. Run `gcloud auth login`")
+                st.error("Failed to get GCP access token. Run `gcloud auth application-default login`")
                 return None
             
-            response = requests.post(
+            response = _HTTP.post(
                 f"{AGENT_ENGINE_URL}:query",
                 headers={
                     "Authorization": f"Bearer {token}",
@@ -341,6 +557,7 @@ def create_session():
                 },
                 timeout=120  # Increased for cold start
             )
+            _invalidate_token(response)
             if response.status_code == 200:
                 data = response.json()
                 return data.get("output", {}).get("id")
@@ -352,7 +569,7 @@ def create_session():
     else:
         # Original ADK backend code
         try:
-            response = requests.post(
+            response = _HTTP.post(
                 f"{BACKEND_URL}/apps/data_science/users/user/sessions",
                 timeout=10
             )
@@ -363,6 +580,22 @@ def create_session():
             st.error(f"Failed to create session: {e}")
         return None
 
+def new_session_events(session_id: str, session_data):
+    """Return only the session events added since the previous turn.
+    
+    The ADK API has no "events after" query, so the event count seen per
+    session is kept in st.session_state and the history is sliced locally.
+    Payloads without an events list are returned unchanged.
+    """
+    events = session_data.get("events") if isinstance(session_data, dict) else None
+    if not isinstance(events, list):
+        return session_data
+    
+    seen = st.session_state.setdefault("last_event_idx", {})
+    new_events = events[seen.get(session_id, 0):]
+    seen[session_id] = len(events)
+    return new_events
+
 def send_message_with_events(session_id: str, message: str, status_container):
     """
     Send message and poll for events to show tool calls.
@@ -388,7 +621,7 @@ def send_message_with_events(session_id: str, message: str, status_container):
                     "artifacts": []
                 }
             
-            response = requests.post(
+            response = _HTTP.post(
                 f"{AGENT_ENGINE_URL}:streamQuery",
                 headers={
                     "Authorization": f"Bearer {token}",
@@ -401,8 +634,10 @@ def send_message_with_events(session_id: str, message: str, status_container):
                         "session_id": session_id
                     }
                 },
-                timeout=300
+                timeout=300,
+                stream=True
             )
+            _invalidate_token(response)
             
             if response.status_code != 200:
                 return {
@@ -413,24 +648,51 @@ def send_message_with_events(session_id: str, message: str, status_container):
                     "artifacts": []
                 }
             
-            # Parse streaming response
+            # Parse the stream as each JSON line arrives, showing progress
+            progress = status_container.container()
+            tools_placeholder = progress.empty()
+            text_placeholder = progress.empty()
             text = ""
-            for line in response.text.strip().split('\n'):
-                if line:
+            shown = (0, "")
+            last_update = 0.0  # first event renders immediately
+            
+            def show_progress():
+                """Render tool calls and text, skipping parts that have not changed."""
+                if len(tool_calls) != shown[0]:
+                    tools_placeholder.markdown(
+                        "".join(f'<span class="tool-call pending">⏳ {tool}</span> ' for tool in tool_calls),
+                        unsafe_allow_html=True
+                    )
+                if text != shown[1]:
+                    text_placeholder.markdown(text)
+                return len(tool_calls), text
+            
+            with response:
+                for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+                    if not line:
+                        continue
                     try:
-                        data = json.loads(line)
-                        # Extract tool calls from actions
-                        if "actions" in data:
-                            actions = data.get("actions", {})
-                            if actions.get("state_delta"):
-                                tool_calls.append("database_settings_loaded")
-                        # Extract text from model response
-                        if "content" in data and "parts" in data["content"]:
-                            for part in data["content"]["parts"]:
-                                if "text" in part:
-                                    text = part["text"]
+                        data = json_loads(line)
                     except json.JSONDecodeError:
                         continue
+                    
+                    # Extract tool calls from actions
+                    if "actions" in data:
+                        actions = data.get("actions", {})
+                        if actions.get("state_delta"):
+                            tool_calls.append("database_settings_loaded")
+                    # Extract text from model response
+                    if "content" in data and "parts" in data["content"]:
+                        for part in data["content"]["parts"]:
+                            if "text" in part:
+                                text = part["text"]
+                    
+                    # Throttle re-renders; a burst of events becomes one update
+                    now = time.monotonic()
+                    if now - last_update >= STREAM_UPDATE_INTERVAL_SECONDS:
+                        shown = show_progress()
+                        last_update = now
+            show_progress()
             
             # Update status with tool calls
             if tool_calls:
@@ -469,7 +731,7 @@ def send_message_with_events(session_id: str, message: str, status_container):
             }
         }
         
-        response = requests.post(
+        response = _HTTP.post(
             f"{BACKEND_URL}/run",
             json=payload,
             timeout=300  # 5 min timeout for complex operations
@@ -484,15 +746,25 @@ def send_message_with_events(session_id: str, message: str, status_container):
                 "artifacts": []
             }
         
+        # Probe for new artifacts in the background while the session is
+        # fetched and parsed
+        artifacts_future = get_background_pool().submit(
+            fetch_session_artifacts,
+            session_id,
+            set(st.session_state.get("shown_artifacts", set())),
+            st.session_state.setdefault("artifact_versions", {}).setdefault(session_id, {})
+        )
+        
         # Now fetch session to get all events including tool calls
-        session_response = requests.get(
+        session_response = _HTTP.get(
             f"{BACKEND_URL}/apps/data_science/users/user/sessions/{session_id}",
             timeout=10
         )
         
+        session_data = None
         if session_response.status_code == 200:
-            session_data = session_response.json()
-            tool_calls = extract_tool_calls(session_data)
+            session_data = new_session_events(session_id, session_response.json())
+            tool_calls, _, session_images, session_file_uris = extract_all(session_data)
             
             # Update status with tool calls
             if tool_calls:
@@ -504,15 +776,13 @@ def send_message_with_events(session_id: str, message: str, status_container):
         # Extract text and images from response
         text, images, file_uris = extract_response_content(response.json())
         
-        # Also check session data for images
-        if session_response.status_code == 200:
-            session_data = session_response.json()
-            _, session_images, session_file_uris = extract_response_content(session_data)
-            images.extend(session_images)
-            file_uris.extend(session_file_uris)
+        # Also check this turn's session events for images
+        if session_data is not None:
+            images = dedupe_images(images + session_images)
+            file_uris = dedupe_uris(file_uris + session_file_uris)
         
-        # Fetch only NEW artifacts (not previously shown)
-        artifacts = fetch_session_artifacts(session_id, st.session_state.get("shown_artifacts", set()))
+        # Collect only NEW artifacts (not previously shown)
+        artifacts = artifacts_future.result()
         
         return {
             "tool_calls": tool_calls,
@@ -541,174 +811,231 @@ def send_message_with_events(session_id: str, message: str, status_container):
 
 def extract_tool_calls(session_data):
     """Extract tool call names from session events."""
-    tool_calls = []
+    return extract_all(session_data)[0]
+
+def dedupe_images(images):
+    """Drop images whose data repeats an earlier one (same chart under several keys)."""
     seen = set()
-    
-    def find_tool_calls(obj):
-        if isinstance(obj, dict):
-            # Look for function_call
-            if "function_call" in obj:
-                fc = obj["function_call"]
-                if isinstance(fc, dict) and "name" in fc:
-                    name = fc["name"]
-                    if name not in seen:
-                        seen.add(name)
-                        tool_calls.append(name)
-            
-            # Look for name field with common tool patterns
-            if "name" in obj:
-                name = obj["name"]
-                if isinstance(name, str) and any(x in name.lower() for x in ["agent", "sql", "bigquery", "research", "analytics"]):
-                    if name not in seen:
-                        seen.add(name)
-                        tool_calls.append(name)
-            
-            for v in obj.values():
-                find_tool_calls(v)
-        elif isinstance(obj, list):
-            for item in obj:
-                find_tool_calls(item)
-    
-    find_tool_calls(session_data)
-    return tool_calls
+    unique = []
+    for image in images:
+        data = image.get("data")
+        if isinstance(data, str):
+            data = data.encode()
+        digest = hashlib.blake2b(data, digest_size=8).digest() if isinstance(data, bytes) else None
+        if digest is not None:
+            if digest in seen:
+                continue
+            seen.add(digest)
+        unique.append(image)
+    return unique
+
+def dedupe_uris(uris):
+    """Drop repeated file URIs, keeping the first occurrence."""
+    seen = set()
+    unique = []
+    for uri in uris:
+        if isinstance(uri, str):
+            if uri in seen:
+                continue
+            seen.add(uri)
+        unique.append(uri)
+    return unique
+
+# Keys that carry text or images; dicts with none of them are only descended
+_CONTENT_KEYS = frozenset({
+    "text", "inline_data", "file_data", "output_files", "code_execution_result",
+    "execution_result", "generatedFiles", "parts"
+})
 
 def extract_response_content(data, debug=False):
     """Extract text and images from the response."""
-    texts = []
-    images = []
-    file_uris = []
+    return extract_all(data, debug)[1:]
+
+# Substrings that mark a "name" field as a tool or agent call
+_TOOL_NAME_HINTS = ("agent", "sql", "bigquery", "research", "analytics")
+
+class _Acc:
+    """Everything extract_all collects during one traversal."""
+    __slots__ = ("tool_calls", "seen_tools", "texts", "images", "file_uris")
     
-    def find_content(obj, path="root"):
-        if isinstance(obj, dict):
-            # Extract text
-            if "text" in obj and isinstance(obj["text"], str):
-                text = obj["text"].strip()
-                if text and len(text) > 5:  # Filter tiny fragments
-                    texts.append(text)
-            
-            # Extract inline images (base64 encoded)
-            if "inline_data" in obj:
-                inline = obj["inline_data"]
-                if isinstance(inline, dict) and "data" in inline:
-                    if debug:
-                        print(f"Found inline_data at {path}")
-                    images.append({
-                        "data": inline["data"],
-                        "mime_type": inline.get("mime_type", "image/png"),
-                        "source": "inline"
-                    })
-            
-            # Extract file_data (Code Interpreter generates these)
-            if "file_data" in obj:
-                file_info = obj["file_data"]
-                if isinstance(file_info, dict):
-                    if "file_uri" in file_info:
-                        if debug:
-                            print(f"Found file_uri at {path}: {file_info['file_uri']}")
-                        file_uris.append(file_info["file_uri"])
-                    if "data" in file_info:
-                        if debug:
-                            print(f"Found file_data with data at {path}")
-                        images.append({
-                            "data": file_info["data"],
-                            "mime_type": file_info.get("mime_type", "image/png"),
-                            "source": "file_data"
-                        })
-            
-            # Extract from code execution output_files
-            if "output_files" in obj:
+    def __init__(self):
+        self.tool_calls = []
+        self.seen_tools = set()
+        self.texts = []
+        self.images = []
+        self.file_uris = []
+
+def _collect_tool_calls(obj, acc):
+    """Collect tool call names held directly by one dict node."""
+    # Look for function_call
+    if "function_call" in obj:
+        fc = obj["function_call"]
+        if isinstance(fc, dict) and "name" in fc:
+            name = fc["name"]
+            if name not in acc.seen_tools:
+                acc.seen_tools.add(name)
+                acc.tool_calls.append(name)
+    
+    # Look for name field with common tool patterns
+    if "name" in obj:
+        name = obj["name"]
+        if isinstance(name, str) and any(x in name.lower() for x in _TOOL_NAME_HINTS):
+            if name not in acc.seen_tools:
+                acc.seen_tools.add(name)
+                acc.tool_calls.append(name)
+
+def _collect_content(obj, acc, path, debug):
+    """Collect text and images held directly by one dict node."""
+    # Extract text
+    if "text" in obj and isinstance(obj["text"], str):
+        text = obj["text"].strip()
+        if text and len(text) > 5:  # Filter tiny fragments
+            acc.texts.append(text)
+    
+    # Extract inline images (base64 encoded)
+    if "inline_data" in obj:
+        inline = obj["inline_data"]
+        if isinstance(inline, dict) and "data" in inline:
+            if debug:
+                print(f"Found inline_data at {path}")
+            acc.images.append({
+                "data": inline["data"],
+                "mime_type": inline.get("mime_type", "image/png"),
+                "source": "inline"
+            })
+    
+    # Extract file_data (Code Interpreter generates these)
+    if "file_data" in obj:
+        file_info = obj["file_data"]
+        if isinstance(file_info, dict):
+            if "file_uri" in file_info:
                 if debug:
-                    print(f"Found output_files at {path}")
-                for i, output_file in enumerate(obj.get("output_files", [])):
+                    print(f"Found file_uri at {path}: {file_info['file_uri']}")
+                acc.file_uris.append(file_info["file_uri"])
+            if "data" in file_info:
+                if debug:
+                    print(f"Found file_data with data at {path}")
+                acc.images.append({
+                    "data": file_info["data"],
+                    "mime_type": file_info.get("mime_type", "image/png"),
+                    "source": "file_data"
+                })
+    
+    # Extract from code execution output_files
+    if "output_files" in obj:
+        if debug:
+            print(f"Found output_files at {path}")
+        for i, output_file in enumerate(obj.get("output_files", [])):
+            if isinstance(output_file, dict):
+                if "contents" in output_file:
+                    acc.images.append({
+                        "data": output_file["contents"],
+                        "mime_type": output_file.get("mime_type", "image/png"),
+                        "source": "output_file"
+                    })
+                # Also check for 'data' field
+                if "data" in output_file:
+                    acc.images.append({
+                        "data": output_file["data"],
+                        "mime_type": output_file.get("mime_type", "image/png"),
+                        "source": "output_file_data"
+                    })
+    
+    # Extract from code_execution_result
+    if "code_execution_result" in obj:
+        result = obj["code_execution_result"]
+        if debug:
+            print(f"Found code_execution_result at {path}")
+        if isinstance(result, dict):
+            if "output_files" in result:
+                for output_file in result.get("output_files", []):
                     if isinstance(output_file, dict):
                         if "contents" in output_file:
-                            images.append({
+                            acc.images.append({
                                 "data": output_file["contents"],
                                 "mime_type": output_file.get("mime_type", "image/png"),
-                                "source": "output_file"
+                                "source": "code_exec_result"
                             })
-                        # Also check for 'data' field
                         if "data" in output_file:
-                            images.append({
+                            acc.images.append({
                                 "data": output_file["data"],
                                 "mime_type": output_file.get("mime_type", "image/png"),
-                                "source": "output_file_data"
-                            })
-            
-            # Extract from code_execution_result
-            if "code_execution_result" in obj:
-                result = obj["code_execution_result"]
-                if debug:
-                    print(f"Found code_execution_result at {path}")
-                if isinstance(result, dict):
-                    if "output_files" in result:
-                        for output_file in result.get("output_files", []):
-                            if isinstance(output_file, dict):
-                                if "contents" in output_file:
-                                    images.append({
-                                        "data": output_file["contents"],
-                                        "mime_type": output_file.get("mime_type", "image/png"),
-                                        "source": "code_exec_result"
-                                    })
-                                if "data" in output_file:
-                                    images.append({
-                                        "data": output_file["data"],
-                                        "mime_type": output_file.get("mime_type", "image/png"),
-                                        "source": "code_exec_result_data"
-                                    })
-            
-            # Check for execution_result (Vertex AI Code Interpreter format)
-            if "execution_result" in obj:
-                exec_result = obj["execution_result"]
-                if debug:
-                    print(f"Found execution_result at {path}")
-                if isinstance(exec_result, dict):
-                    if "output_files" in exec_result:
-                        for output_file in exec_result.get("output_files", []):
-                            if isinstance(output_file, dict):
-                                if "contents" in output_file:
-                                    images.append({
-                                        "data": output_file["contents"],
-                                        "mime_type": output_file.get("mime_type", "image/png"),
-                                        "source": "exec_result"
-                                    })
-            
-            # Check for generatedFiles (another possible format)
-            if "generatedFiles" in obj:
-                if debug:
-                    print(f"Found generatedFiles at {path}")
-                for gen_file in obj.get("generatedFiles", []):
-                    if isinstance(gen_file, dict):
-                        if "uri" in gen_file:
-                            file_uris.append(gen_file["uri"])
-                        if "data" in gen_file:
-                            images.append({
-                                "data": gen_file["data"],
-                                "mime_type": gen_file.get("mimeType", "image/png"),
-                                "source": "generated_file"
+                                "source": "code_exec_result_data"
                             })
-            
-            # Check for Parts with inlineData (Gemini API format)
-            if "parts" in obj and isinstance(obj["parts"], list):
-                for part in obj["parts"]:
-                    if isinstance(part, dict) and "inlineData" in part:
-                        inline = part["inlineData"]
-                        if debug:
-                            print(f"Found inlineData in parts at {path}")
-                        if isinstance(inline, dict) and "data" in inline:
-                            images.append({
-                                "data": inline["data"],
-                                "mime_type": inline.get("mimeType", "image/png"),
-                                "source": "parts_inline"
+    
+    # Check for execution_result (Vertex AI Code Interpreter format)
+    if "execution_result" in obj:
+        exec_result = obj["execution_result"]
+        if debug:
+            print(f"Found execution_result at {path}")
+        if isinstance(exec_result, dict):
+            if "output_files" in exec_result:
+                for output_file in exec_result.get("output_files", []):
+                    if isinstance(output_file, dict):
+                        if "contents" in output_file:
+                            acc.images.append({
+                                "data": output_file["contents"],
+                                "mime_type": output_file.get("mime_type", "image/png"),
+                                "source": "exec_result"
                             })
-            
-            for k, v in obj.items():
-                find_content(v, f"{path}.{k}")
+    
+    # Check for generatedFiles (another possible format)
+    if "generatedFiles" in obj:
+        if debug:
+            print(f"Found generatedFiles at {path}")
+        for gen_file in obj.get("generatedFiles", []):
+            if isinstance(gen_file, dict):
+                if "uri" in gen_file:
+                    acc.file_uris.append(gen_file["uri"])
+                if "data" in gen_file:
+                    acc.images.append({
+                        "data": gen_file["data"],
+                        "mime_type": gen_file.get("mimeType", "image/png"),
+                        "source": "generated_file"
+                    })
+    
+    # Check for Parts with inlineData (Gemini API format)
+    if "parts" in obj and isinstance(obj["parts"], list):
+        for part in obj["parts"]:
+            if isinstance(part, dict) and "inlineData" in part:
+                inline = part["inlineData"]
+                if debug:
+                    print(f"Found inlineData in parts at {path}")
+                if isinstance(inline, dict) and "data" in inline:
+                    acc.images.append({
+                        "data": inline["data"],
+                        "mime_type": inline.get("mimeType", "image/png"),
+                        "source": "parts_inline"
+                    })
+
+def extract_all(data, debug=False):
+    """Extract tool calls, text, images and file URIs in a single traversal.
+    
+    Returns (tool_calls, final_text, images, file_uris).
+    """
+    acc = _Acc()
+    
+    # Walk with an explicit stack in document order; paths are kept on a
+    # parallel stack only when debugging
+    stack = deque([data])
+    paths = deque(["root"]) if debug else None
+    while stack:
+        obj = stack.pop()
+        path = paths.pop() if debug else None
+        if isinstance(obj, dict):
+            if "function_call" in obj or "name" in obj:
+                _collect_tool_calls(obj, acc)
+            if not _CONTENT_KEYS.isdisjoint(obj):
+                _collect_content(obj, acc, path, debug)
+            stack.extend(reversed(obj.values()))
+            if debug:
+                paths.extend(f"{path}.{k}" for k in reversed(obj))
         elif isinstance(obj, list):
-            for i, item in enumerate(obj):
-                find_content(item, f"{path}[{i}]")
+            stack.extend(reversed(obj))
+            if debug:
+                paths.extend(f"{path}[{i}]" for i in reversed(range(len(obj))))
     
-    find_content(data)
+    texts = acc.texts
     
     # Get the last substantial text (usually the final response)
     final_text = ""
@@ -720,7 +1047,7 @@ def extract_response_content(data, debug=False):
     if not final_text and texts:
         final_text = texts[-1]
     
-    return final_text or "Response received.", images, file_uris
+    return acc.tool_calls, final_text or "Response received.", dedupe_images(acc.images), dedupe_uris(acc.file_uris)
 
 # Header
 col1, col2 = st.columns([3, 1])
@@ -738,7 +1065,8 @@ with st.sidebar:
     if st.button("➕ New Session", use_container_width=True):
         st.session_state.session_id = create_session()
         st.session_state.messages = []
-        st.session_state.shown_artifacts = set()  # Reset shown artifacts
+        st.session_state.shown_artifacts = OrderedDict()  # Reset shown artifacts
+        st.session_state.artifact_versions = {}  # Reset known artifact versions
         st.rerun()
     
     st.markdown("---")
@@ -789,11 +1117,18 @@ if not st.session_state.session_id:
 # Main chat area
 st.markdown("---")
 
-# Display chat history
-for msg in st.session_state.messages:
+def mark_artifact_shown(key: str):
+    """Record an artifact as displayed, keeping only the most recent keys."""
+    shown = st.session_state.shown_artifacts
+    shown[key] = None
+    shown.move_to_end(key)
+    if len(shown) > MAX_SHOWN_ARTIFACTS:
+        shown.popitem(last=False)
+
+def render_message(msg: dict):
+    """Render one chat message; images are decoded once and kept on the message."""
     if msg["role"] == "user":
-        st.markdown(f'<div style="text-align: right;"><div class="user-message">{msg["content"]}</div></div>', 
-                   unsafe_allow_html=True)
+        st.markdown(USER_MSG_TEMPLATE.format(html.escape(msg["content"])), unsafe_allow_html=True)
     else:
         # Show tool calls if any
         if msg.get("tool_calls"):
@@ -801,43 +1136,52 @@ for msg in st.session_state.messages:
             for tool in msg["tool_calls"]:
                 tools_html += f'<span class="tool-call complete">✓ {tool}</span> '
             st.markdown(tools_html, unsafe_allow_html=True)
-        
+    
         # Show text response
         st.markdown(f'<div class="agent-message">', unsafe_allow_html=True)
         st.markdown(msg["text"])
         st.markdown('</div>', unsafe_allow_html=True)
-        
+    
         # Show images if any
         if msg.get("images"):
             for img_data in msg["images"]:
                 display_image(img_data)
-        
+    
         # Show GCS file URIs if any
         if msg.get("file_uris"):
             for uri in msg["file_uris"]:
-                if uri and ("png" in uri.lower() or "jpg" in uri.lower() or "jpeg" in uri.lower() or "image" in uri.lower()):
+                if not isinstance(uri, str):
+                    continue
+                uri_lower = uri.lower()
+                if uri_lower.endswith(_IMG_EXTS) or "image" in uri_lower:
                     display_gcs_image(uri)
-        
+    
         # Show artifacts (charts from Code Interpreter)
         if msg.get("artifacts"):
             for artifact in msg["artifacts"]:
                 try:
                     data = artifact.get("data")
                     if data and len(data) > 100:  # Valid image should be > 100 bytes
-                        st.image(data, caption=artifact.get("name", "Chart"), use_container_width=True)
+                        show_image(data, artifact, artifact.get("content_type", "image/png"),
+                                   caption=artifact.get("name", "Chart"), use_container_width=True)
                         # Mark artifact as shown
                         if "key" in artifact:
-                            st.session_state.shown_artifacts.add(artifact["key"])
+                            mark_artifact_shown(artifact["key"])
                     else:
                         st.warning(f"Chart data too small or empty: {artifact.get('name', 'unknown')}")
                 except Exception as e:
                     st.error(f"Could not display chart: {str(e)[:100]}")
 
-# Handle quick actions
-if st.session_state.quick_action:
-    user_input = st.session_state.quick_action
-    st.session_state.quick_action = None
-    
+
+def render_history():
+    """Display chat history."""
+    for msg in st.session_state.messages:
+        render_message(msg)
+
+render_history()
+
+def handle_user_input(user_input: str):
+    """Show the user's message, send it to the agent and render the reply."""
     # Add user message to history
     st.session_state.messages.append({
         "role": "user",
@@ -845,8 +1189,7 @@ if st.session_state.quick_action:
     })
     
     # Display user message
-    st.markdown(f'<div style="text-align: right;"><div class="user-message">{user_input}</div></div>', 
-               unsafe_allow_html=True)
+    st.markdown(USER_MSG_TEMPLATE.format(html.escape(user_input)), unsafe_allow_html=True)
     
     # Create status container
     status_container = st.empty()
@@ -855,49 +1198,24 @@ if st.session_state.quick_action:
     response = send_message_with_events(st.session_state.session_id, user_input, status_container)
     
     # Add to history
-    st.session_state.messages.append({
+    assistant_msg = {
         "role": "assistant",
         "text": response["text"],
         "tool_calls": response["tool_calls"],
         "images": response["images"],
         "file_uris": response.get("file_uris", []),
         "artifacts": response.get("artifacts", [])
-    })
+    }
+    st.session_state.messages.append(assistant_msg)
     
-    # Clear status and rerun to show full response
-    status_container.empty()
-    st.rerun()
+    # Replace the status with the full response; no full-script rerun needed
+    with status_container.container():
+        render_message(assistant_msg)
 
-# Chat input
+# Quick actions from the sidebar take precedence over the chat input
+quick_action = st.session_state.quick_action
+st.session_state.quick_action = None
 user_input = st.chat_input("Ask about demand data, predictions, or analysis...")
 
-if user_input:
-    # Add user message
-    st.session_state.messages.append({
-        "role": "user",
-        "content": user_input
-    })
-    
-    # Display user message
-    st.markdown(f'<div style="text-align: right;"><div class="user-message">{user_input}</div></div>', 
-               unsafe_allow_html=True)
-    
-    # Create status container
-    status_container = st.empty()
-    
-    # Send message and get response
-    response = send_message_with_events(st.session_state.session_id, user_input, status_container)
-    
-    # Add to history
-    st.session_state.messages.append({
-        "role": "assistant",
-        "text": response["text"],
-        "tool_calls": response["tool_calls"],
-        "images": response["images"],
-        "file_uris": response.get("file_uris", []),
-        "artifacts": response.get("artifacts", [])
-    })
-    
-    # Clear status and rerun to show full response
-    status_container.empty()
-    st.rerun()
+if quick_action or user_input:
+    handle_user_input(quick_action or user_input)
@@ -0,0 +1,38 @@
+"""
+Memoized mock-service lookups shared by the UI components.
+
+Each st.cache_data function keeps its own cache, so the accessors are
+defined once here and imported wherever a component needs them.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+
+import streamlit as st
+
+from services.mock_data import DemandDriverData, ForecastResult, get_mock_service
+
+
+@st.cache_data(ttl=300, max_entries=512, show_spinner=False)
+def cached_forecast(
+    product_id: str,
+    customer_id: str,
+    location_id: str,
+    as_of_date: date,
+) -> ForecastResult:
+    """Forecast for a context, memoized across reruns."""
+    return get_mock_service().get_forecast(product_id, customer_id, location_id, as_of_date)
+
+
+@st.cache_data(ttl=300, max_entries=512, show_spinner=False)
+def cached_demand_drivers(
+    product_id: str,
+    customer_id: str,
+    location_id: str,
+    as_of_date: date,
+) -> DemandDriverData:
+    """Demand driver data for a context, memoized across reruns."""
+    return get_mock_service().get_demand_drivers(
+        product_id, customer_id, location_id, as_of_date
+    )
@@ -17,15 +17,36 @@ Architecture Note:
 from __future__ import annotations
 
 from datetime import date, timedelta
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import streamlit as st
 
-from services.mock_data import get_mock_service
+from components._cache import cached_demand_drivers, cached_forecast
 
+# Plotly config for summary charts that need no hover/zoom layer
+_STATIC_PLOT_CONFIG = {"staticPlot": True, "displayModeBar": False}
 
+# Line colors for the driver trend chart, cycled in selection order
+_TREND_COLORS = ("#14B8A6", "#A78BFA", "#F59E0B", "#EF4444", "#3B82F6")
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _numeric_driver_names(
+    product_id: str,
+    customer_id: str,
+    location_id: str,
+    as_of_date: date,
+) -> Tuple[str, ...]:
+    """Names of the first 8 numeric drivers for a context (limited for readability)."""
+    drivers = cached_demand_drivers(product_id, customer_id, location_id, as_of_date).drivers
+    # type() rather than isinstance() so booleans are excluded
+    return tuple(k for k, v in drivers.items() if type(v) in (int, float))[:8]
+
+
+@st.fragment
 def render_chart_section(
     product_id: str,
     customer_id: str,
@@ -40,8 +61,6 @@ def render_chart_section(
     - Historical trend simulation
     - Interactive chart builder
     """
-    mock_service = get_mock_service()
-
     st.markdown("### 📊 Analytics Dashboard")
 
     # Chart type selector
@@ -68,36 +87,34 @@ def render_chart_section(
         _render_time_series_trend(product_id, customer_id, location_id)
 
 
-def _render_driver_importance_chart(
+@st.cache_data(ttl=600, show_spinner=False)
+def _build_driver_importance_fig(
     product_id: str,
     customer_id: str,
     location_id: str,
     as_of_date: date,
-) -> None:
-    """Renders a horizontal bar chart showing driver importance/contribution."""
-    mock_service = get_mock_service()
-    forecast = mock_service.get_forecast(product_id, customer_id, location_id, as_of_date)
+) -> go.Figure:
+    """Builds the driver contribution bar chart for a context."""
+    forecast = cached_forecast(product_id, customer_id, location_id, as_of_date)
 
-    contributions = forecast.driver_contributions
-    df = pd.DataFrame([
-        {"Driver": k, "Contribution (%)": v * 100}
-        for k, v in sorted(contributions.items(), key=lambda x: x[1], reverse=True)
-    ])
-
-    # Color based on positive/negative
-    df["Color"] = df["Contribution (%)"].apply(lambda x: "#14B8A6" if x >= 0 else "#F87171")
+    items = sorted(
+        forecast.driver_contributions.items(), key=lambda x: x[1], reverse=True
+    )
+    drivers = [k for k, _ in items]
+    contrib = np.fromiter((v * 100 for _, v in items), dtype=np.float64, count=len(items))
 
     fig = go.Figure()
 
     fig.add_trace(go.Bar(
-        y=df["Driver"],
-        x=df["Contribution (%)"],
+        y=drivers,
+        x=contrib,
         orientation="h",
         marker=dict(
-            color=df["Color"],
+            # Color based on positive/negative
+            color=np.where(contrib >= 0, "#14B8A6", "#F87171"),
             line=dict(color="#1E293B", width=1),
         ),
-        text=df["Contribution (%)"].apply(lambda x: f"{x:+.1f}%"),
+        text=np.char.mod("%+.1f%%", contrib),
         textposition="outside",
         textfont=dict(color="#F8FAFC", size=12),
     ))
@@ -124,9 +141,26 @@ def _render_driver_importance_chart(
         margin=dict(l=20, r=100, t=60, b=40),
     )
 
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
+
+
+def _render_driver_importance_chart(
+    product_id: str,
+    customer_id: str,
+    location_id: str,
+    as_of_date: date,
+) -> None:
+    """Renders a horizontal bar chart showing driver importance/contribution."""
+    st.plotly_chart(
+        _build_driver_importance_fig(product_id, customer_id, location_id, as_of_date),
+        use_container_width=True,
+        config=_STATIC_PLOT_CONFIG,
+    )
 
     # Insight box
+    contributions = cached_forecast(
+        product_id, customer_id, location_id, as_of_date
+    ).driver_contributions
     top_driver = max(contributions.items(), key=lambda x: abs(x[1]))
     st.markdown(
         f"""
@@ -148,56 +182,75 @@ def _render_driver_importance_chart(
     )
 
 
-def _render_forecast_vs_actuals(product_id: str, customer_id: str) -> None:
-    """Renders a line chart comparing forecasted vs actual sales (simulated historical data)."""
-    # Simulated historical data
-    dates = pd.date_range(end=date.today(), periods=30, freq="D")
-
-    import numpy as np
-    np.random.seed(42)
+@st.cache_data(ttl=600, show_spinner=False)
+def _sim_forecast_series(
+    product_id: str,
+    end_date: date,
+) -> Tuple[pd.DatetimeIndex, np.ndarray, np.ndarray]:
+    """Simulated 30-day dates, forecast and actuals ending at ``end_date``."""
+    rng = np.random.default_rng(42)
 
     base = 85 if "POND" in product_id else 75
-    forecast_values = base + np.random.normal(0, 10, 30).cumsum() * 0.3
-    actual_values = forecast_values + np.random.normal(0, 8, 30)
+    forecast_values = base + rng.normal(0, 10, 30).cumsum() * 0.3
+    actual_values = forecast_values + rng.normal(0, 8, 30)
 
-    df = pd.DataFrame({
-        "Date": dates,
-        "Forecast": forecast_values,
-        "Actual": actual_values,
-    })
+    return pd.date_range(end=end_date, periods=30, freq="D"), forecast_values, actual_values
 
-    fig = go.Figure()
 
-    fig.add_trace(go.Scatter(
-        x=df["Date"],
-        y=df["Forecast"],
-        name="Forecast",
-        mode="lines+markers",
-        line=dict(color="#A78BFA", width=2),
-        marker=dict(size=6),
-    ))
+@st.cache_data(ttl=600, show_spinner=False)
+def _sim_trend_frame(drivers: Tuple[str, ...], end_date: date) -> pd.DataFrame:
+    """Simulated 30-day series for each driver, ending at ``end_date``."""
+    rng = np.random.default_rng(42)
 
-    fig.add_trace(go.Scatter(
-        x=df["Date"],
-        y=df["Actual"],
-        name="Actual",
-        mode="lines+markers",
-        line=dict(color="#14B8A6", width=2),
-        marker=dict(size=6),
-    ))
+    data = {"Date": pd.date_range(end=end_date, periods=30, freq="D")}
+    for driver in drivers:
+        base = rng.uniform(50, 100)
+        trend = rng.uniform(-0.5, 0.5)
+        noise = rng.normal(0, 5, 30)
+        data[driver] = base + np.arange(30) * trend + noise
 
-    # Add shaded area for forecast error
-    fig.add_trace(go.Scatter(
-        x=df["Date"].tolist() + df["Date"].tolist()[::-1],
-        y=(df["Forecast"] + 10).tolist() + (df["Forecast"] - 10).tolist()[::-1],
-        fill="toself",
-        fillcolor="rgba(167, 139, 250, 0.1)",
-        line=dict(color="rgba(255,255,255,0)"),
-        name="Confidence Band",
-        showlegend=True,
-    ))
+    return pd.DataFrame(data)
 
-    fig.update_layout(
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _build_forecast_vs_actuals_fig(
+    product_id: str,
+    end_date: date,
+) -> Tuple[go.Figure, float, float]:
+    """Builds the forecast vs actuals chart, returning it with its MAPE and bias."""
+    # Simulated historical data
+    dates, forecast_values, actual_values = _sim_forecast_series(product_id, end_date)
+
+    traces = [
+        go.Scatter(
+            x=dates,
+            y=forecast_values,
+            name="Forecast",
+            mode="lines+markers",
+            line=dict(color="#A78BFA", width=2),
+            marker=dict(size=6),
+        ),
+        go.Scatter(
+            x=dates,
+            y=actual_values,
+            name="Actual",
+            mode="lines+markers",
+            line=dict(color="#14B8A6", width=2),
+            marker=dict(size=6),
+        ),
+        # Shaded area for forecast error
+        go.Scatter(
+            x=dates.append(dates[::-1]),
+            y=np.concatenate([forecast_values + 10, (forecast_values - 10)[::-1]]),
+            fill="toself",
+            fillcolor="rgba(167, 139, 250, 0.1)",
+            line=dict(color="rgba(255,255,255,0)"),
+            name="Confidence Band",
+            showlegend=True,
+        ),
+    ]
+
+    fig = go.Figure(data=traces, layout=go.Layout(
         title=dict(
             text="Forecast vs Actual Sales (Last 30 Days)",
             font=dict(color="#F8FAFC", size=16),
@@ -223,12 +276,21 @@ def _render_forecast_vs_actuals(product_id: str, customer_id: str) -> None:
             font=dict(color="#F8FAFC"),
         ),
         height=400,
-    )
+    ))
+
+    # Calculate MAPE
+    err = actual_values - forecast_values
+    mape = np.mean(np.abs(err / actual_values)) * 100
+    bias = -err.mean()
+
+    return fig, float(mape), float(bias)
 
+
+def _render_forecast_vs_actuals(product_id: str, customer_id: str) -> None:
+    """Renders a line chart comparing forecasted vs actual sales (simulated historical data)."""
+    fig, mape, bias = _build_forecast_vs_actuals_fig(product_id, date.today())
     st.plotly_chart(fig, use_container_width=True)
 
-    # Calculate MAPE
-    mape = np.mean(np.abs((df["Actual"] - df["Forecast"]) / df["Actual"])) * 100
     accuracy = 100 - mape
 
     col1, col2, col3 = st.columns(3)
@@ -237,42 +299,26 @@ def _render_forecast_vs_actuals(product_id: str, customer_id: str) -> None:
     with col2:
         st.metric("MAPE", f"{mape:.1f}%")
     with col3:
-        bias = np.mean(df["Forecast"] - df["Actual"])
         st.metric("Bias", f"{bias:+.1f} units")
 
 
-def _render_correlation_heatmap(
+@st.cache_data(ttl=600, show_spinner=False)
+def _build_heatmap_fig(
     product_id: str,
     customer_id: str,
     location_id: str,
     as_of_date: date,
-) -> None:
-    """Renders a correlation heatmap between demand drivers."""
-    mock_service = get_mock_service()
-    driver_data = mock_service.get_demand_drivers(
-        product_id, customer_id, location_id, as_of_date
-    )
-
-    # Select numeric drivers for correlation
-    numeric_drivers = {
-        k: v for k, v in driver_data.drivers.items()
-        if isinstance(v, (int, float)) and not isinstance(v, bool)
-    }
+) -> go.Figure:
+    """Builds the driver correlation heatmap for a context."""
+    driver_names = _numeric_driver_names(product_id, customer_id, location_id, as_of_date)
+    n = len(driver_names)
 
     # Simulated correlation matrix (in production, this would come from BigQuery analysis)
-    import numpy as np
-    np.random.seed(42)
+    rng = np.random.default_rng(42)
 
-    driver_names = list(numeric_drivers.keys())[:8]  # Limit for readability
-    n = len(driver_names)
-
-    # Generate a semi-realistic correlation matrix
-    corr_matrix = np.eye(n)
-    for i in range(n):
-        for j in range(i + 1, n):
-            corr = np.random.uniform(-0.5, 0.8)
-            corr_matrix[i, j] = corr
-            corr_matrix[j, i] = corr
+    # Generate a semi-realistic correlation matrix: symmetric, unit diagonal
+    corr_matrix = np.triu(rng.uniform(-0.5, 0.8, size=(n, n)), 1)
+    corr_matrix = corr_matrix + corr_matrix.T + np.eye(n)
 
     # Shorten names for display
     short_names = [name[:15] + "..." if len(name) > 18 else name for name in driver_names]
@@ -287,8 +333,7 @@ def _render_correlation_heatmap(
             [1, "#14B8A6"],
         ],
         zmid=0,
-        text=np.round(corr_matrix, 2),
-        texttemplate="%{text}",
+        texttemplate="%{z:.2f}",
         textfont=dict(size=10, color="#F8FAFC"),
         hovertemplate="<b>%{x}</b> vs <b>%{y}</b><br>Correlation: %{z:.2f}<extra></extra>",
     ))
@@ -310,67 +355,42 @@ def _render_correlation_heatmap(
         height=500,
     )
 
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 
-def _render_time_series_trend(
+def _render_correlation_heatmap(
     product_id: str,
     customer_id: str,
     location_id: str,
+    as_of_date: date,
 ) -> None:
-    """Renders a multi-driver time series trend chart."""
-    mock_service = get_mock_service()
-
-    # Let user select drivers to plot
-    available_drivers = [
-        "Sales Velocity",
-        "PDP Views",
-        "Marketing Spend",
-        "Sentiment Score",
-        "Discount Depth",
-    ]
-
-    selected_drivers = st.multiselect(
-        "Select drivers to plot",
-        options=available_drivers,
-        default=["Sales Velocity", "PDP Views"],
-        key="trend_drivers_select",
+    """Renders a correlation heatmap between demand drivers."""
+    st.plotly_chart(
+        _build_heatmap_fig(product_id, customer_id, location_id, as_of_date),
+        use_container_width=True,
+        config=_STATIC_PLOT_CONFIG,
     )
 
-    if not selected_drivers:
-        st.info("Please select at least one driver to display.")
-        return
 
+@st.cache_data(ttl=600, show_spinner=False)
+def _build_trend_fig(selected_drivers: Tuple[str, ...], end_date: date) -> go.Figure:
+    """Builds the multi-driver trend chart for the selected drivers."""
     # Simulated time series data
-    import numpy as np
-    np.random.seed(42)
-
-    dates = pd.date_range(end=date.today(), periods=30, freq="D")
-
-    data = {"Date": dates}
-    for driver in selected_drivers:
-        base = np.random.uniform(50, 100)
-        trend = np.random.uniform(-0.5, 0.5)
-        noise = np.random.normal(0, 5, 30)
-        values = base + np.arange(30) * trend + noise
-        data[driver] = values
+    df = _sim_trend_frame(selected_drivers, end_date)
 
-    df = pd.DataFrame(data)
-
-    fig = go.Figure()
-
-    colors = ["#14B8A6", "#A78BFA", "#F59E0B", "#EF4444", "#3B82F6"]
-    for idx, driver in enumerate(selected_drivers):
-        fig.add_trace(go.Scatter(
+    traces = [
+        go.Scatter(
             x=df["Date"],
             y=df[driver],
             name=driver,
             mode="lines+markers",
-            line=dict(color=colors[idx % len(colors)], width=2),
+            line=dict(color=_TREND_COLORS[idx % len(_TREND_COLORS)], width=2),
             marker=dict(size=5),
-        ))
+        )
+        for idx, driver in enumerate(selected_drivers)
+    ]
 
-    fig.update_layout(
+    fig = go.Figure(data=traces, layout=go.Layout(
         title=dict(
             text="Driver Trends Over Time",
             font=dict(color="#F8FAFC", size=16),
@@ -396,6 +416,38 @@ def _render_time_series_trend(
             font=dict(color="#F8FAFC"),
         ),
         height=400,
+    ))
+
+    return fig
+
+
+def _render_time_series_trend(
+    product_id: str,
+    customer_id: str,
+    location_id: str,
+) -> None:
+    """Renders a multi-driver time series trend chart."""
+    # Let user select drivers to plot
+    available_drivers = [
+        "Sales Velocity",
+        "PDP Views",
+        "Marketing Spend",
+        "Sentiment Score",
+        "Discount Depth",
+    ]
+
+    selected_drivers = st.multiselect(
+        "Select drivers to plot",
+        options=available_drivers,
+        default=["Sales Velocity", "PDP Views"],
+        key="trend_drivers_select",
     )
 
-    st.plotly_chart(fig, use_container_width=True)
+    if not selected_drivers:
+        st.info("Please select at least one driver to display.")
+        return
+
+    st.plotly_chart(
+        _build_trend_fig(tuple(selected_drivers), date.today()),
+        use_container_width=True,
+    )
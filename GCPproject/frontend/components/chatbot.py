@@ -13,14 +13,36 @@ Vertex AI Agent Engine for real-time responses.
 
 from __future__ import annotations
 
-import base64
-from datetime import date, datetime
-from typing import Dict, List, Any
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date
+from typing import Any, Dict, List, Optional
 
 import streamlit as st
 
 from services.api_client import AgentEngineClient, AgentResponse
 from services.mock_data import get_mock_service
+from components._cache import cached_demand_drivers, cached_forecast
+
+# Chat history is re-rendered on every rerun; keep at most this many messages
+MAX_CHAT_HISTORY = 50
+
+# Only the most recent messages keep their images and artifacts
+RICH_CONTENT_WINDOW = 20
+
+# Agent Engine queries that may run concurrently (shared by all sessions)
+AGENT_QUERY_WORKERS = 4
+
+
+@st.cache_resource
+def _get_agent_client() -> AgentEngineClient:
+    """One Agent Engine client per process, so its connection pool is reused."""
+    return AgentEngineClient()
+
+
+@st.cache_resource
+def _get_query_executor() -> ThreadPoolExecutor:
+    """Worker pool that runs Agent Engine queries off the script thread."""
+    return ThreadPoolExecutor(max_workers=AGENT_QUERY_WORKERS, thread_name_prefix="agent-query")
 
 
 def render_chatbot(
@@ -45,6 +67,10 @@ def render_chatbot(
     if "agent_session_id" not in st.session_state:
         st.session_state.agent_session_id = None
 
+    # Agent Engine queries still running in the background
+    if "pending_responses" not in st.session_state:
+        st.session_state.pending_responses = []
+
     # Chat header
     st.markdown("### 🤖 Demand Planner Assistant")
     st.caption("Ask about forecasts, predictions & demand drivers")
@@ -61,6 +87,8 @@ def render_chatbot(
 
     st.markdown("---")
 
+    _collect_pending_responses()
+
     # Chat messages container
     chat_container = st.container(height=450)
 
@@ -87,11 +115,16 @@ def render_chatbot(
     if st.button("🗑️ Clear Chat", key="clear_chat", use_container_width=True):
         st.session_state.chat_history = []
         st.session_state.agent_session_id = None
+        st.session_state.pending_responses = []
         st.rerun()
 
 
 def _render_rich_content(msg: Dict[str, Any]) -> None:
     """Render rich content from assistant message including text, images, and artifacts."""
+    if msg.get("status") == "pending":
+        _render_pending_message(msg)
+        return
+
     # Render main text content with markdown support
     if msg.get("content"):
         st.markdown(msg["content"])
@@ -101,27 +134,17 @@ def _render_rich_content(msg: Dict[str, Any]) -> None:
         st.markdown("#### 📊 Generated Charts")
         for idx, img in enumerate(msg["images"]):
             try:
-                mime_type = img.get("mime_type", "image/png")
-                data = img.get("data", "")
                 name = img.get("name", f"Chart {idx + 1}")
-                if data:
-                    # Ensure data doesn't have data URL prefix
-                    if data.startswith("data:"):
-                        st.image(data, caption=name)
-                    else:
-                        st.image(f"data:{mime_type};base64,{data}", caption=name)
+                url = img.get("url", "")
+                if url:
+                    st.image(url, caption=name)
             except Exception as e:
                 st.warning(f"Could not display image '{name}': {e}")
     
     # Render artifacts (code, files, text output, etc.)
+    # Whether any artifact is worth showing is decided once, when the response is collected
     if msg.get("artifacts"):
-        has_displayable = any(
-            a.get("name") not in ["code_output"] or 
-            (isinstance(a.get("data"), dict) and a["data"].get("type") == "text" and len(a["data"].get("content", "")) > 100)
-            for a in msg["artifacts"]
-        )
-        
-        if has_displayable:
+        if msg.get("show_artifacts"):
             for artifact in msg["artifacts"]:
                 name = artifact.get("name", "artifact")
                 data = artifact.get("data")
@@ -161,8 +184,8 @@ def _render_rich_content(msg: Dict[str, Any]) -> None:
                 # Handle dict artifacts with inline_data (missed images)
                 elif isinstance(data, dict) and "inline_data" in data:
                     inline = data["inline_data"]
-                    if inline.get("mime_type", "").startswith("image/"):
-                        st.image(f"data:{inline['mime_type']};base64,{inline.get('data', '')}", caption=name)
+                    if inline.get("url"):
+                        st.image(inline["url"], caption=name)
                     else:
                         with st.expander(f"📎 {name}", expanded=False):
                             st.json(data)
@@ -172,8 +195,8 @@ def _render_rich_content(msg: Dict[str, Any]) -> None:
                     for part in data["parts"]:
                         if "inline_data" in part:
                             inline = part["inline_data"]
-                            if inline.get("mime_type", "").startswith("image/"):
-                                st.image(f"data:{inline['mime_type']};base64,{inline.get('data', '')}", caption=name)
+                            if inline.get("url"):
+                                st.image(inline["url"], caption=name)
                         elif "text" in part:
                             with st.expander(f"📄 {name}", expanded=False):
                                 st.write(part["text"])
@@ -188,6 +211,9 @@ def _render_rich_content(msg: Dict[str, Any]) -> None:
                     with st.expander(f"📎 {name}", expanded=False):
                         st.code(data)
     
+    if msg.get("trimmed"):
+        st.caption("Charts and artifacts from older messages are not kept.")
+
     # Show tool calls if present (for transparency)
     if msg.get("tool_calls"):
         with st.expander("🔧 Tools Used", expanded=False):
@@ -202,26 +228,138 @@ def _handle_user_message(
     location_id: str,
     as_of_date: date,
 ) -> None:
-    """Process user message and generate response with rich content."""
+    """
+    Process user message and start generating the rich response.
+
+    The Agent Engine query streams on the shared worker pool; a pending
+    assistant message holds its place in the history, showing the text
+    received so far, until the result is collected on a later rerun.
+    """
     # Add user message
-    st.session_state.chat_history.append({
+    _append_chat_message({
         "role": "user",
         "content": message,
     })
 
-    # Generate rich response
-    response = _generate_rich_response(message, product_id, customer_id, location_id, as_of_date)
+    # Placeholder filled in by _collect_pending_responses
+    pending_msg = {"role": "assistant", "content": "", "status": "pending"}
+    _append_chat_message(pending_msg)
 
-    # Add assistant response with all content types
-    st.session_state.chat_history.append({
-        "role": "assistant",
-        "content": response.text,
-        "images": response.images,
-        "artifacts": response.artifacts,
-        "tool_calls": response.tool_calls,
+    st.session_state.pending_responses.append({
+        "msg": pending_msg,
+        "future": _submit_agent_query(pending_msg, message, product_id, customer_id, location_id, as_of_date),
+        "request": (message, product_id, customer_id, location_id, as_of_date),
     })
 
 
+def _collect_pending_responses() -> bool:
+    """
+    Move finished Agent Engine responses into their placeholder messages.
+
+    Returns True if any response was collected.
+    """
+    still_pending = []
+    collected = False
+    for pending in st.session_state.pending_responses:
+        if not pending["future"].done():
+            still_pending.append(pending)
+            continue
+
+        response = _resolve_agent_response(pending["future"], *pending["request"])
+        _precompute_image_urls(response)
+
+        msg = pending["msg"]
+        msg.pop("status", None)
+        msg.pop("partial", None)
+        msg.update({
+            "content": response.text,
+            "images": response.images,
+            "artifacts": response.artifacts,
+            "show_artifacts": _has_displayable_artifacts(response.artifacts),
+            "tool_calls": response.tool_calls,
+        })
+        collected = True
+
+    st.session_state.pending_responses = still_pending
+    return collected
+
+
+@st.fragment(run_every=1)
+def _render_pending_message(msg: Dict[str, Any]) -> None:
+    """
+    Show the text streamed so far for a pending response, refreshed every
+    second; reruns the app once the response has been collected.
+    """
+    if _collect_pending_responses():
+        st.rerun()
+
+    if msg.get("partial"):
+        st.markdown(msg["partial"])
+    st.caption("⏳ The Demand Planner Agent is working on it...")
+
+
+def _append_chat_message(msg: Dict[str, Any]) -> None:
+    """
+    Append a message to the chat history, keeping it bounded.
+
+    The oldest messages beyond MAX_CHAT_HISTORY are dropped, and the message
+    that falls out of RICH_CONTENT_WINDOW loses its images and artifacts so
+    their base64 payloads are not held (or re-rendered) for the whole session.
+    """
+    history = st.session_state.chat_history
+    history.append(msg)
+    if len(history) > MAX_CHAT_HISTORY:
+        del history[:-MAX_CHAT_HISTORY]
+
+    if len(history) > RICH_CONTENT_WINDOW:
+        old_msg = history[-RICH_CONTENT_WINDOW - 1]
+        if old_msg.get("images") or old_msg.get("artifacts"):
+            old_msg["images"] = []
+            old_msg["artifacts"] = []
+            old_msg["show_artifacts"] = False
+            old_msg["trimmed"] = True
+
+
+def _has_displayable_artifacts(artifacts: List[Dict[str, Any]]) -> bool:
+    """True unless the only artifacts are short code outputs."""
+    return any(
+        a.get("name") not in ["code_output"] or
+        (isinstance(a.get("data"), dict) and a["data"].get("type") == "text" and len(a["data"].get("content", "")) > 100)
+        for a in artifacts
+    )
+
+
+def _to_data_url(mime_type: str, data: str) -> str:
+    """Return base64 image data as a data URL (unchanged if it already is one)."""
+    return data if data.startswith("data:") else f"data:{mime_type};base64,{data}"
+
+
+def _precompute_image_urls(response: AgentResponse) -> None:
+    """
+    Build each image's data URL once when the response arrives.
+
+    The chat history is re-rendered on every rerun, so the URL is stored on
+    the image dict (as "url") and the raw base64 string is dropped instead of
+    rebuilding the concatenation for every historical image each time.
+    """
+    for img in response.images:
+        data = img.pop("data", "")
+        if data:
+            img["url"] = _to_data_url(img.get("mime_type", "image/png"), data)
+
+    for artifact in response.artifacts:
+        data = artifact.get("data")
+        if not isinstance(data, dict):
+            continue
+        inlines = [data["inline_data"]] if "inline_data" in data else [
+            part["inline_data"] for part in data.get("parts", []) if "inline_data" in part
+        ]
+        for inline in inlines:
+            mime_type = inline.get("mime_type", "")
+            if mime_type.startswith("image/"):
+                inline["url"] = _to_data_url(mime_type, inline.pop("data", ""))
+
+
 def _handle_quick_action(
     action: str,
     product_id: str,
@@ -240,18 +378,21 @@ def _handle_quick_action(
     st.rerun()
 
 
-def _generate_rich_response(
+def _submit_agent_query(
+    pending_msg: Dict[str, Any],
     message: str,
     product_id: str,
     customer_id: str,
     location_id: str,
     as_of_date: date,
-) -> AgentResponse:
+) -> Future:
     """
-    Generate a rich response using the Vertex AI Agent Engine.
-    
-    Returns AgentResponse with text, images, artifacts, and metadata.
-    
+    Submit a query to the Vertex AI Agent Engine on the worker pool.
+
+    The response is streamed: text is published on `pending_msg` as it
+    arrives, and the future resolves to the full AgentResponse with text,
+    images, artifacts, and metadata.
+
     Architecture:
     1. Streamlit sends query to Agent Engine (Demand Planner Agent)
     2. Agent queries BigQuery, runs ML predictions, performs analysis
@@ -267,28 +408,55 @@ Context:
 
 User Question: {message}
 """
-    
-    # Use Agent Engine for rich response
-    agent_client = AgentEngineClient()
-    
+
+    # Session state is only readable from the script thread, so resolve it here
+    return _get_query_executor().submit(
+        _stream_agent_query,
+        _get_agent_client(),
+        pending_msg,
+        context_message,
+        f"streamlit-{customer_id}",
+        st.session_state.get("agent_session_id"),
+    )
+
+
+def _stream_agent_query(
+    agent_client: AgentEngineClient,
+    pending_msg: Dict[str, Any],
+    context_message: str,
+    user_id: str,
+    session_id: Optional[str],
+) -> AgentResponse:
+    """Run a streaming query on a worker thread, publishing partial text on the placeholder."""
+    response = AgentResponse()
+    for text in agent_client.query_rich_stream(
+        context_message, response, user_id=user_id, session_id=session_id
+    ):
+        pending_msg["partial"] = text
+    return response
+
+
+def _resolve_agent_response(
+    future: Future,
+    message: str,
+    product_id: str,
+    customer_id: str,
+    location_id: str,
+    as_of_date: date,
+) -> AgentResponse:
+    """Result of a finished Agent Engine query, falling back to mock data on failure."""
     try:
-        # Get rich response from Agent Engine
-        response = agent_client.query_rich(
-            message=context_message,
-            user_id=f"streamlit-{customer_id}",
-            session_id=st.session_state.get("agent_session_id"),
-        )
-        
-        if response.text and not response.text.startswith("Error"):
-            return response
-        else:
-            # Fallback to mock if Agent Engine fails
-            return _fallback_mock_response(message, product_id, customer_id, location_id, as_of_date)
-            
-    except Exception as e:
+        response = future.result()
+    except Exception:
         # Fallback to mock data on error
         return _fallback_mock_response(message, product_id, customer_id, location_id, as_of_date)
 
+    if response.text and not response.text.startswith("Error"):
+        return response
+
+    # Fallback to mock if Agent Engine fails
+    return _fallback_mock_response(message, product_id, customer_id, location_id, as_of_date)
+
 
 def _fallback_mock_response(
     message: str,
@@ -299,8 +467,8 @@ def _fallback_mock_response(
 ) -> AgentResponse:
     """Fallback to mock data if Agent Engine is unavailable."""
     mock_service = get_mock_service()
-    forecast = mock_service.get_forecast(product_id, customer_id, location_id, as_of_date)
-    driver_data = mock_service.get_demand_drivers(product_id, customer_id, location_id, as_of_date)
+    forecast = cached_forecast(product_id, customer_id, location_id, as_of_date)
+    driver_data = cached_demand_drivers(product_id, customer_id, location_id, as_of_date)
 
     message_lower = message.lower()
 
@@ -324,22 +492,23 @@ def _fallback_mock_response(
 
     # DATA SCIENCE QUERIES
     elif any(word in message_lower for word in ["driver", "important", "affect", "impact"]):
-        sorted_drivers = sorted(
-            forecast.driver_contributions.items(),
-            key=lambda x: abs(x[1]),
-            reverse=True,
-        )
-
-        driver_list = "\n".join([
-            f"- **{d[0]}**: {'+' if d[1] >= 0 else ''}{d[1]*100:.1f}%"
-            for d in sorted_drivers
-        ])
+        # sorted() evaluates the key once per driver; format each share once
+        ranked = [
+            (name, f"{'+' if value >= 0 else ''}{value*100:.1f}%")
+            for name, value in sorted(
+                forecast.driver_contributions.items(),
+                key=lambda x: abs(x[1]),
+                reverse=True,
+            )
+        ]
+        driver_list = "\n".join(f"- **{name}**: {share}" for name, share in ranked)
+        top_name, top_share = ranked[0]
 
         text = f"""**📊 Driver Importance Analysis** *(Mock Data - Agent Engine Unavailable)*
 
 {driver_list}
 
-**Key Insight:** Top driver is **{sorted_drivers[0][0]}** ({'+' if sorted_drivers[0][1] >= 0 else ''}{sorted_drivers[0][1]*100:.1f}%)
+**Key Insight:** Top driver is **{top_name}** ({top_share})
 
 💡 *Use Data Scientist tab for detailed charts.*"""
         return AgentResponse(text=text)
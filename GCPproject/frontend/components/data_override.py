@@ -13,11 +13,13 @@ from __future__ import annotations
 from datetime import date
 from typing import Optional
 
-import pandas as pd
 import streamlit as st
 
 from services.mock_data import get_mock_service
 
+# st.badge (native status pill) is available from Streamlit 1.44
+NATIVE_BADGE_ENABLED = tuple(int(x) for x in st.__version__.split(".")[:2]) >= (1, 44)
+
 
 def render_data_override_table(
     product_id: str,
@@ -46,33 +48,22 @@ def render_data_override_table(
 
     # Approval status indicator
     status = forecast.approval_status
-    status_colors = {
-        "pending": ("#F59E0B", "⏳"),
-        "approved": ("#22C55E", "✅"),
-        "rejected": ("#EF4444", "❌"),
+    status_badges = {
+        "pending": ("⏳", "orange"),
+        "approved": ("✅", "green"),
+        "rejected": ("❌", "red"),
     }
-    color, icon = status_colors.get(status, ("#64748B", "•"))
-
-    st.markdown(
-        f"""
-        <div style="
-            display: inline-flex;
-            align-items: center;
-            gap: 8px;
-            background: {color}20;
-            border: 1px solid {color};
-            border-radius: 20px;
-            padding: 6px 16px;
-            margin-bottom: 16px;
-        ">
-            <span>{icon}</span>
-            <span style="color: {color}; font-weight: 600; text-transform: uppercase; font-size: 0.75rem;">
-                {status}
-            </span>
-        </div>
-        """,
-        unsafe_allow_html=True,
-    )
+    icon, badge_color = status_badges.get(status, ("•", "gray"))
+
+    if NATIVE_BADGE_ENABLED:
+        st.badge(status.upper(), icon=icon, color=badge_color)
+    else:
+        # Older Streamlit: styled by the .status-pill classes in styles/theme.py
+        st.markdown(
+            f'<div class="status-pill {status}"><span>{icon}</span>'
+            f'<span class="status">{status}</span></div>',
+            unsafe_allow_html=True,
+        )
 
     # Main override section
     col1, col2 = st.columns([2, 1])
@@ -80,87 +71,35 @@ def render_data_override_table(
     with col1:
         st.markdown("##### Forecast Summary")
 
-        # Create a summary table
-        summary_data = {
-            "Metric": [
-                "Statistical Baseline",
-                "AI Sensed Demand",
-                "Change (%)",
-                "Planner Override",
-            ],
-            "Value": [
-                f"{forecast.baseline_forecast:.0f} units",
-                f"{forecast.sensed_demand:.0f} units",
-                f"{'+' if forecast.boost_percent >= 0 else ''}{forecast.boost_percent:.1f}%",
-                "—" if forecast.planner_override is None else f"{forecast.planner_override:.0f} units",
-            ],
-        }
-
-        df_summary = pd.DataFrame(summary_data)
-        st.dataframe(
-            df_summary,
-            hide_index=True,
-            use_container_width=True,
+        # A four-row summary renders as a markdown table; no DataFrame needed
+        override_text = (
+            "—" if forecast.planner_override is None
+            else f"{forecast.planner_override:.0f} units"
+        )
+        st.markdown(
+            "| Metric | Value |\n"
+            "|---|---|\n"
+            f"| Statistical Baseline | {forecast.baseline_forecast:.0f} units |\n"
+            f"| AI Sensed Demand | {forecast.sensed_demand:.0f} units |\n"
+            f"| Change (%) | {'+' if forecast.boost_percent >= 0 else ''}{forecast.boost_percent:.1f}% |\n"
+            f"| Planner Override | {override_text} |"
         )
 
     with col2:
         st.markdown("##### Enter Override")
 
-        # Initialize session state for override
+        # Initialize session state for override; widget keys below derive from it
         override_key = f"override_{product_id}_{customer_id}_{location_id}_{as_of_date}"
-        if override_key not in st.session_state:
-            st.session_state[override_key] = None
-
-        # Override input
-        override_value = st.number_input(
-            "Override Value (units)",
-            min_value=0.0,
-            max_value=10000.0,
-            value=float(forecast.sensed_demand),
-            step=1.0,
-            key=f"override_input_{override_key}",
-            help="Enter your adjusted forecast if different from AI suggestion",
-        )
+        st.session_state.setdefault(override_key, None)
 
-        # Calculate difference
-        diff = override_value - forecast.sensed_demand
-        diff_pct = (diff / forecast.sensed_demand * 100) if forecast.sensed_demand > 0 else 0
-
-        if abs(diff) > 0.5:
-            diff_color = "#F59E0B"
-            st.markdown(
-                f"""
-                <div style="
-                    background: {diff_color}20;
-                    border: 1px solid {diff_color};
-                    border-radius: 8px;
-                    padding: 12px;
-                    margin-top: 8px;
-                ">
-                    <span style="color: {diff_color}; font-weight: 600;">
-                        ⚠️ Difference: {'+' if diff > 0 else ''}{diff:.0f} units ({'+' if diff_pct > 0 else ''}{diff_pct:.1f}%)
-                    </span>
-                </div>
-                """,
-                unsafe_allow_html=True,
-            )
+        _render_override_input(override_key, forecast.sensed_demand)
 
     # Reasoning section
     st.markdown("---")
     st.markdown("##### 🤖 AI Reasoning")
 
     st.markdown(
-        f"""
-        <div style="
-            background: #1E293B;
-            border: 1px solid #334155;
-            border-radius: 12px;
-            padding: 20px;
-            line-height: 1.6;
-        ">
-            {forecast.reasoning.replace(chr(10), '<br>')}
-        </div>
-        """,
+        f'<div class="reasoning-box">{forecast.reasoning.replace(chr(10), "<br>")}</div>',
         unsafe_allow_html=True,
     )
 
@@ -184,7 +123,7 @@ def render_data_override_table(
                     location_id=location_id,
                     as_of_date=as_of_date.strftime("%Y-%m-%d"),
                     status="approved",
-                    override_value=override_value if abs(diff) > 0.5 else None,
+                    override_value=_committed_override(override_key, forecast.sensed_demand),
                 )
                 st.success("✅ Forecast approved! Data will be written to Final Consensus Demand DB.")
                 st.balloons()
@@ -215,3 +154,46 @@ def render_data_override_table(
         "💡 On approval, the final consensus demand will be written to `final-consensus-demand-db` (Cloud SQL) "
         "for downstream supply planning systems."
     )
+
+
+def _commit_override(override_key: str) -> None:
+    """Store the override value once the planner commits it in the input."""
+    st.session_state[override_key] = st.session_state[f"override_input_{override_key}"]
+
+
+def _committed_override(override_key: str, sensed_demand: float) -> Optional[float]:
+    """Committed override value, or None if it does not differ from the AI suggestion."""
+    override_value = st.session_state.get(override_key)
+    if override_value is None or abs(override_value - sensed_demand) <= 0.5:
+        return None
+    return override_value
+
+
+@st.fragment
+def _render_override_input(override_key: str, sensed_demand: float) -> None:
+    """
+    Renders the override input and its difference banner.
+
+    Runs as a fragment, so editing the value reruns only this block instead
+    of the whole app; the committed value is kept in session state under
+    override_key for the approval buttons.
+    """
+    st.number_input(
+        "Override Value (units)",
+        min_value=0.0,
+        max_value=10000.0,
+        value=float(sensed_demand),
+        step=1.0,
+        key=f"override_input_{override_key}",
+        on_change=_commit_override,
+        args=(override_key,),
+        help="Enter your adjusted forecast if different from AI suggestion",
+    )
+
+    override_value = _committed_override(override_key, sensed_demand)
+    if override_value is None:
+        return
+
+    diff = override_value - sensed_demand
+    diff_pct = (diff / sensed_demand * 100) if sensed_demand > 0 else 0
+    st.warning(f"Difference: {diff:+.0f} units ({diff_pct:+.1f}%)", icon="⚠️")
@@ -11,7 +11,7 @@ Layout (top to bottom):
 from __future__ import annotations
 
 from datetime import date, timedelta
-from typing import Tuple
+from typing import Dict, List, Tuple
 
 import streamlit as st
 
@@ -21,6 +21,14 @@ from components.agent_status import render_agent_status
 from components.sidebar_chat import render_sidebar_chat
 
 
+@st.cache_data(ttl=600, show_spinner=False)
+def _get_product_display_map() -> Tuple[List[str], Dict[str, str]]:
+    """Product IDs and their display names, built once rather than per rerun."""
+    mock_service = get_mock_service()
+    products = mock_service.get_products()
+    return products, {p: mock_service.get_product_display_name(p) for p in products}
+
+
 def render_sidebar() -> Tuple[str, str, str, date]:
     """
     Renders the sidebar with compact config + chat.
@@ -61,8 +69,7 @@ def render_sidebar() -> Tuple[str, str, str, date]:
         )
 
         # Product Selection (compact)
-        products = mock_service.get_products()
-        product_display = {p: mock_service.get_product_display_name(p) for p in products}
+        products, product_display = _get_product_display_map()
 
         selected_product = st.selectbox(
             "Product",
@@ -10,12 +10,68 @@ Features:
 
 from __future__ import annotations
 
+import re
 from datetime import date, datetime
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
 import streamlit as st
 
 from services.mock_data import get_mock_service
+from components._cache import cached_demand_drivers, cached_forecast
+
+# Chat history kept in session state; older messages are dropped
+MAX_CHAT_HISTORY = 50
+
+# Messages always shown in the chat panel; older ones sit behind a toggle
+VISIBLE_CHAT_MESSAGES = 20
+
+# Data science menu answers (exact match on the lower-cased input)
+_OPT_DRIVERS = frozenset({"1", "driver", "importance", "drivers"})
+_OPT_TREND = frozenset({"2", "trend", "trends"})
+_OPT_CORRELATION = frozenset({"3", "correlation", "correlate"})
+_OPT_WEATHER = frozenset({"4", "weather"})
+
+# Intent keywords, matched anywhere in the input in a single scan
+_CONFIRM_KW = re.compile(r"generate|yes|proceed")
+_DEMAND_KW = re.compile(r"forecast|demand|generate|predict")
+_DS_KW = re.compile(r"driver|analysis|chart|trend|data")
+
+_EMPTY_PLACEHOLDER_HTML = """
+<div style="
+    color: #64748B;
+    font-size: 0.8rem;
+    text-align: center;
+    padding: 20px 10px;
+">
+    Click <b>🎯 Demand</b> to generate forecast<br>
+    or <b>📊 Analysis</b> for data science queries
+</div>
+"""
+
+_DS_MENU = """**📊 Data Science Query**
+
+What would you like to analyze?
+
+1️⃣ **Driver importance** - Which factors affect demand most?
+2️⃣ **Trend analysis** - How are drivers changing over time?
+3️⃣ **Correlation** - How do drivers relate to each other?
+4️⃣ **Weather impact** - How does weather affect this product?
+
+Type a number (1-4) or ask your own question."""
+
+_HELP_TEXT = """I can help you with:
+
+**🎯 Demand Generation** - Click the button or type "forecast"
+**📊 Data Science** - Click the button or type "analysis"
+
+What would you like to do?"""
+
+_QUERY_HELP_TEXT = """I didn't understand that query. Try asking about:
+• **Marketing** - "How is marketing spend affecting demand?"
+• **Competitors** - "What's the competitor impact?"
+• **Social trends** - "How are social signals?"
+
+Or select a numbered option (1-4)."""
 
 
 def render_sidebar_chat(
@@ -62,26 +118,18 @@ def render_sidebar_chat(
     
     with chat_container:
         if not st.session_state.sidebar_chat_history:
-            st.markdown(
-                """
-                <div style="
-                    color: #64748B;
-                    font-size: 0.8rem;
-                    text-align: center;
-                    padding: 20px 10px;
-                ">
-                    Click <b>🎯 Demand</b> to generate forecast<br>
-                    or <b>📊 Analysis</b> for data science queries
-                </div>
-                """,
-                unsafe_allow_html=True,
-            )
+            st.markdown(_EMPTY_PLACEHOLDER_HTML, unsafe_allow_html=True)
         else:
-            for msg in st.session_state.sidebar_chat_history:
-                if msg["role"] == "assistant":
-                    st.chat_message("assistant", avatar="🤖").write(msg["content"])
-                elif msg["role"] == "user":
-                    st.chat_message("user", avatar="👤").write(msg["content"])
+            history = st.session_state.sidebar_chat_history
+            older_count = len(history) - VISIBLE_CHAT_MESSAGES
+            # Older messages are only emitted when asked for, not on every rerun
+            if older_count > 0 and st.toggle(
+                f"Show {older_count} older messages", key="sidebar_show_older"
+            ):
+                for msg in history[:older_count]:
+                    _render_message(msg)
+            for msg in history[-VISIBLE_CHAT_MESSAGES:]:
+                _render_message(msg)
 
     # Input box
     user_input = st.chat_input("Type your message...", key="sidebar_chat_input")
@@ -98,6 +146,22 @@ def render_sidebar_chat(
             st.rerun()
 
 
+def _render_message(msg: Dict[str, str]) -> None:
+    """Render one chat message with its role avatar."""
+    if msg["role"] == "assistant":
+        st.chat_message("assistant", avatar="🤖").write(msg["content"])
+    elif msg["role"] == "user":
+        st.chat_message("user", avatar="👤").write(msg["content"])
+
+
+def _append_message(msg: Dict[str, str]) -> None:
+    """Append a message to the chat history, dropping the oldest beyond MAX_CHAT_HISTORY."""
+    history = st.session_state.sidebar_chat_history
+    history.append(msg)
+    if len(history) > MAX_CHAT_HISTORY:
+        del history[:-MAX_CHAT_HISTORY]
+
+
 def _start_demand_flow(product_id: str, customer_id: str, location_id: str, as_of_date: date) -> None:
     """Start the demand generation conversation flow."""
     st.session_state.chat_mode = "demand"
@@ -107,7 +171,7 @@ def _start_demand_flow(product_id: str, customer_id: str, location_id: str, as_o
     product_name = mock_service.get_product_display_name(product_id)
     
     # Agent initiates conversation
-    st.session_state.sidebar_chat_history.append({
+    _append_message({
         "role": "assistant",
         "content": f"""**🎯 Demand Forecast Generation**
 
@@ -128,18 +192,9 @@ def _start_datascience_flow() -> None:
     st.session_state.sidebar_chat_history = []
     
     # Agent initiates conversation
-    st.session_state.sidebar_chat_history.append({
+    _append_message({
         "role": "assistant",
-        "content": """**📊 Data Science Query**
-
-What would you like to analyze?
-
-1️⃣ **Driver importance** - Which factors affect demand most?
-2️⃣ **Trend analysis** - How are drivers changing over time?
-3️⃣ **Correlation** - How do drivers relate to each other?
-4️⃣ **Weather impact** - How does weather affect this product?
-
-Type a number (1-4) or ask your own question."""
+        "content": _DS_MENU,
     })
 
 
@@ -152,7 +207,7 @@ def _handle_user_input(
 ) -> None:
     """Process user input and generate response."""
     # Add user message
-    st.session_state.sidebar_chat_history.append({
+    _append_message({
         "role": "user",
         "content": user_input,
     })
@@ -166,7 +221,7 @@ def _handle_user_input(
         as_of_date,
     )
     
-    st.session_state.sidebar_chat_history.append({
+    _append_message({
         "role": "assistant",
         "content": response,
     })
@@ -180,7 +235,6 @@ def _generate_response(
     as_of_date: date,
 ) -> str:
     """Generate a response based on user input and current mode."""
-    mock_service = get_mock_service()
     input_lower = user_input.lower().strip()
     mode = st.session_state.chat_mode
     
@@ -188,8 +242,8 @@ def _generate_response(
     # DEMAND GENERATION MODE
     # =========================================================================
     if mode == "demand":
-        if "generate" in input_lower or "yes" in input_lower or "proceed" in input_lower:
-            forecast = mock_service.get_forecast(product_id, customer_id, location_id, as_of_date)
+        if _CONFIRM_KW.search(input_lower):
+            forecast = cached_forecast(product_id, customer_id, location_id, as_of_date)
             
             return f"""**✅ Forecast Generated!**
 
@@ -210,21 +264,23 @@ def _generate_response(
     # DATA SCIENCE MODE
     # =========================================================================
     elif mode == "datascience":
-        forecast = mock_service.get_forecast(product_id, customer_id, location_id, as_of_date)
-        driver_data = mock_service.get_demand_drivers(product_id, customer_id, location_id, as_of_date)
-        
+        # Forecast and driver data are only fetched by the branches that use them
         # Option 1: Driver importance
-        if input_lower in ["1", "driver", "importance", "drivers"]:
+        if input_lower in _OPT_DRIVERS:
+            forecast = cached_forecast(product_id, customer_id, location_id, as_of_date)
+            ranked = _sort_drivers_signed(forecast.driver_contributions)
+            # The largest |contribution| sits at one end of the signed ordering
+            top_driver = max(ranked[0], ranked[-1], key=lambda x: abs(x[1]))[0]
             return f"""**📊 Driver Importance Analysis**
 
-{_format_all_drivers(forecast.driver_contributions)}
+{_format_drivers(ranked)}
 
-**Insight:** Top driver is **{max(forecast.driver_contributions.items(), key=lambda x: abs(x[1]))[0]}**
+**Insight:** Top driver is **{top_driver}**
 
 📈 *View chart in Data Scientist tab → Driver Importance*"""
         
         # Option 2: Trend analysis
-        elif input_lower in ["2", "trend", "trends"]:
+        elif input_lower in _OPT_TREND:
             return """**📈 Trend Analysis**
 
 To see detailed trend charts:
@@ -235,7 +291,7 @@ To see detailed trend charts:
 The chart will show 30-day trends for selected drivers."""
         
         # Option 3: Correlation
-        elif input_lower in ["3", "correlation", "correlate"]:
+        elif input_lower in _OPT_CORRELATION:
             return """**🔗 Correlation Analysis**
 
 To see driver correlations:
@@ -245,7 +301,9 @@ To see driver correlations:
 This shows how drivers relate to each other (positive/negative correlations)."""
         
         # Option 4: Weather
-        elif input_lower in ["4", "weather"]:
+        elif input_lower in _OPT_WEATHER:
+            forecast = cached_forecast(product_id, customer_id, location_id, as_of_date)
+            driver_data = cached_demand_drivers(product_id, customer_id, location_id, as_of_date)
             temp = driver_data.drivers.get("Max Temperature Forecast", 25)
             uv = driver_data.drivers.get("UV Index", 5)
             weather_contrib = forecast.driver_contributions.get("Weather", 0)
@@ -263,25 +321,22 @@ Weather contributes **{'+' if weather_contrib >= 0 else ''}{weather_contrib*100:
         
         # Custom question
         else:
+            forecast = cached_forecast(product_id, customer_id, location_id, as_of_date)
+            driver_data = cached_demand_drivers(product_id, customer_id, location_id, as_of_date)
             return _handle_custom_query(input_lower, forecast, driver_data)
     
     # =========================================================================
     # NO MODE - General response
     # =========================================================================
     else:
-        if any(word in input_lower for word in ["forecast", "demand", "generate", "predict"]):
+        if _DEMAND_KW.search(input_lower):
             _start_demand_flow(product_id, customer_id, location_id, as_of_date)
             return st.session_state.sidebar_chat_history[-1]["content"]
-        elif any(word in input_lower for word in ["driver", "analysis", "chart", "trend", "data"]):
+        elif _DS_KW.search(input_lower):
             _start_datascience_flow()
             return st.session_state.sidebar_chat_history[-1]["content"]
         else:
-            return """I can help you with:
-
-**🎯 Demand Generation** - Click the button or type "forecast"
-**📊 Data Science** - Click the button or type "analysis"
-
-What would you like to do?"""
+            return _HELP_TEXT
 
 
 def _handle_custom_query(query: str, forecast, driver_data) -> str:
@@ -315,36 +370,24 @@ Contribution: **{'+' if contrib >= 0 else ''}{contrib*100:.1f}%**
 {'Social signals are driving uplift!' if contrib > 0.05 else 'Social signals are neutral.'}"""
     
     else:
-        return """I didn't understand that query. Try asking about:
-• **Marketing** - "How is marketing spend affecting demand?"
-• **Competitors** - "What's the competitor impact?"
-• **Social trends** - "How are social signals?"
-
-Or select a numbered option (1-4)."""
-
-
-def _format_top_drivers(contributions: Dict[str, float]) -> str:
-    """Format top 3 drivers as bullet points."""
-    sorted_drivers = sorted(contributions.items(), key=lambda x: abs(x[1]), reverse=True)[:3]
-    return "\n".join([
-        f"• **{d[0]}**: {'+' if d[1] >= 0 else ''}{d[1]*100:.1f}%"
-        for d in sorted_drivers
-    ])
-
-
-def _format_all_drivers(contributions: Dict[str, float]) -> str:
-    """Format all drivers as a list."""
-    sorted_drivers = sorted(contributions.items(), key=lambda x: x[1], reverse=True)
-    return "\n".join([
-        f"• **{d[0]}**: {'+' if d[1] >= 0 else ''}{d[1]*100:.1f}%"
-        for d in sorted_drivers
-    ])
-
-
-
+        return _QUERY_HELP_TEXT
 
 
+def _sort_drivers_signed(contributions: Dict[str, float]) -> List[Tuple[str, float]]:
+    """Drivers ordered from most positive to most negative contribution."""
+    return sorted(contributions.items(), key=lambda x: x[1], reverse=True)
 
 
+def _format_drivers(drivers: List[Tuple[str, float]]) -> str:
+    """Format (driver, contribution) pairs as bullet points."""
+    return "\n".join(
+        f"• **{name}**: {'+' if value >= 0 else ''}{value*100:.1f}%"
+        for name, value in drivers
+    )
 
 
+def _format_top_drivers(contributions: Dict[str, float]) -> str:
+    """Format top 3 drivers as bullet points."""
+    return _format_drivers(
+        sorted(contributions.items(), key=lambda x: abs(x[1]), reverse=True)[:3]
+    )
@@ -297,6 +297,13 @@ class AgentEngineClient:
         settings = get_settings()
         self.endpoint_url = settings.agent_engine_url
         self.timeout = 180.0  # Agent Engine may take longer
+        self._http: Optional[httpx.Client] = None
+
+    def _get_http(self) -> httpx.Client:
+        """Shared HTTP client, so repeated queries reuse pooled connections."""
+        if self._http is None:
+            self._http = httpx.Client(timeout=self.timeout)
+        return self._http
 
     def _get_headers(self) -> Dict[str, str]:
         """Get request headers with auth token."""
@@ -341,28 +348,28 @@ class AgentEngineClient:
             payload["input"]["session_id"] = session_id
 
         try:
-            with httpx.Client(timeout=self.timeout) as client:
-                with client.stream(
-                    "POST",
-                    self.endpoint_url,
-                    headers=headers,
-                    json=payload,
-                ) as response:
-                    if response.status_code != 200:
-                        yield f"Error {response.status_code}: {response.text}"
-                        return
-
-                    for line in response.iter_lines():
-                        if line:
-                            try:
-                                data = json.loads(line)
-                                # Extract text from model response
-                                if "content" in data and "parts" in data["content"]:
-                                    for part in data["content"]["parts"]:
-                                        if "text" in part:
-                                            yield part["text"]
-                            except json.JSONDecodeError:
-                                continue
+            client = self._get_http()
+            with client.stream(
+                "POST",
+                self.endpoint_url,
+                headers=headers,
+                json=payload,
+            ) as response:
+                if response.status_code != 200:
+                    yield f"Error {response.status_code}: {response.text}"
+                    return
+
+                for line in response.iter_lines():
+                    if line:
+                        try:
+                            data = json.loads(line)
+                            # Extract text from model response
+                            if "content" in data and "parts" in data["content"]:
+                                for part in data["content"]["parts"]:
+                                    if "text" in part:
+                                        yield part["text"]
+                        except json.JSONDecodeError:
+                            continue
 
         except httpx.TimeoutException:
             yield "Error: Request timed out"
@@ -386,10 +393,39 @@ class AgentEngineClient:
         Returns:
             AgentResponse with text, images, artifacts, and metadata
         """
+        result = AgentResponse()
+        for _ in self.query_rich_stream(message, result, user_id=user_id, session_id=session_id):
+            pass
+        return result
+
+    def query_rich_stream(
+        self,
+        message: str,
+        result: AgentResponse,
+        user_id: str = "frontend-user",
+        session_id: Optional[str] = None,
+    ) -> Generator[str, None, None]:
+        """
+        Stream a rich response from the Agent Engine.
+        
+        Events are parsed as they arrive and accumulated into `result`
+        (text, images, artifacts, and metadata), so callers can show
+        progress long before the agent has finished.
+        
+        Args:
+            message: The natural language query
+            result: AgentResponse filled in as events arrive
+            user_id: User identifier
+            session_id: Optional session ID
+            
+        Yields:
+            The latest response text each time a new text part arrives
+        """
         headers = self._get_headers()
         
         if not headers.get("Authorization") or headers["Authorization"] == "Bearer ":
-            return AgentResponse(text="Error: Could not get GCP access token. Run `gcloud auth login`")
+            result.text = "Error: Could not get GCP access token. Run `gcloud auth login`"
+            return
 
         payload = {
             "input": {
@@ -400,191 +436,191 @@ class AgentEngineClient:
         if session_id:
             payload["input"]["session_id"] = session_id
 
-        result = AgentResponse()
-        
         try:
-            with httpx.Client(timeout=self.timeout) as client:
-                response = client.post(
-                    self.endpoint_url,
-                    headers=headers,
-                    json=payload,
-                )
-                
+            client = self._get_http()
+            with client.stream(
+                "POST",
+                self.endpoint_url,
+                headers=headers,
+                json=payload,
+            ) as response:
                 if response.status_code != 200:
+                    response.read()
                     result.text = f"Error {response.status_code}: {response.text}"
-                    return result
+                    return
 
-                # Parse all events from the streaming response
-                for line in response.text.strip().split('\n'):
+                for line in response.iter_lines():
                     if not line:
                         continue
                     try:
                         data = json.loads(line)
-                        
-                        # Track tool calls and artifacts
-                        if "actions" in data:
-                            actions = data["actions"]
-                            if "state_delta" in actions and actions["state_delta"]:
-                                result.metadata["state"] = actions["state_delta"]
-                            
-                            # Handle artifact_delta from analytics agent / code executor
-                            # ADK artifacts use google.genai.types.Content format:
-                            # { "artifact_name": { "parts": [{ "inline_data": { "mime_type": "...", "data": "base64..." }}] }}
-                            if "artifact_delta" in actions and actions["artifact_delta"]:
-                                for artifact_name, artifact_data in actions["artifact_delta"].items():
-                                    image_extracted = False
-                                    
-                                    if isinstance(artifact_data, dict):
-                                        # Format 1: Direct inline_data
-                                        if "inline_data" in artifact_data:
-                                            inline = artifact_data["inline_data"]
-                                            if inline.get("mime_type", "").startswith("image/"):
-                                                data_str = inline.get("data", "")
-                                                # Handle bytes if needed
-                                                if isinstance(data_str, bytes):
-                                                    import base64
-                                                    data_str = base64.b64encode(data_str).decode('utf-8')
-                                                result.images.append({
-                                                    "mime_type": inline["mime_type"],
-                                                    "data": data_str,
-                                                    "name": artifact_name
-                                                })
-                                                image_extracted = True
-                                        
-                                        # Format 2: ADK Content format with parts array
-                                        if "parts" in artifact_data:
-                                            for part in artifact_data["parts"]:
-                                                if "inline_data" in part:
-                                                    inline = part["inline_data"]
-                                                    if inline.get("mime_type", "").startswith("image/"):
-                                                        data_str = inline.get("data", "")
-                                                        if isinstance(data_str, bytes):
-                                                            import base64
-                                                            data_str = base64.b64encode(data_str).decode('utf-8')
-                                                        result.images.append({
-                                                            "mime_type": inline["mime_type"],
-                                                            "data": data_str,
-                                                            "name": artifact_name
-                                                        })
-                                                        image_extracted = True
-                                                # Also check for text parts in artifacts
-                                                if "text" in part:
-                                                    result.artifacts.append({
-                                                        "name": artifact_name,
-                                                        "data": {"type": "text", "content": part["text"]}
-                                                    })
-                                        
-                                        # Format 3: fileData format (GCS URIs, etc.)
-                                        if "fileData" in artifact_data:
-                                            file_data = artifact_data["fileData"]
-                                            result.artifacts.append({
-                                                "name": artifact_name,
-                                                "data": {"type": "file", "uri": file_data.get("fileUri", ""), "mime_type": file_data.get("mimeType", "")}
-                                            })
-                                    
-                                    # Store non-image artifacts for reference
-                                    if not image_extracted and artifact_data:
-                                        result.artifacts.append({
-                                            "name": artifact_name,
-                                            "data": artifact_data
-                                        })
-                        
-                        # Extract content parts
-                        if "content" in data and "parts" in data["content"]:
-                            for part in data["content"]["parts"]:
-                                # Text content
-                                if "text" in part:
-                                    result.text = part["text"]
-                                
-                                # Image content (inline data from model or code executor)
-                                if "inline_data" in part:
-                                    inline = part["inline_data"]
-                                    if inline.get("mime_type", "").startswith("image/"):
-                                        result.images.append({
-                                            "mime_type": inline["mime_type"],
-                                            "data": inline.get("data", "")
-                                        })
-                                
-                                # Code execution results (from analytics agent / VertexAiCodeExecutor)
-                                if "code_execution_result" in part:
-                                    exec_result = part["code_execution_result"]
-                                    
-                                    # Check for output_files (primary method for matplotlib/charts)
-                                    # Format: [{"name": "...", "mime_type": "image/png", "data": "base64..."}]
-                                    if "output_files" in exec_result and exec_result["output_files"]:
-                                        for file_info in exec_result["output_files"]:
-                                            mime = file_info.get("mime_type", file_info.get("mimeType", ""))
-                                            if mime.startswith("image/"):
-                                                data_str = file_info.get("data", "")
-                                                if isinstance(data_str, bytes):
-                                                    import base64
-                                                    data_str = base64.b64encode(data_str).decode('utf-8')
-                                                result.images.append({
-                                                    "mime_type": mime,
-                                                    "data": data_str,
-                                                    "name": file_info.get("name", "chart")
-                                                })
-                                            else:
-                                                # Non-image file artifact
-                                                result.artifacts.append({
-                                                    "name": file_info.get("name", "file"),
-                                                    "data": {"type": "file", "mime_type": mime, "data": file_info.get("data", "")}
-                                                })
-                                    
-                                    # Check for output text (might contain data URLs or plain output)
-                                    if "output" in exec_result and exec_result["output"]:
-                                        output = exec_result["output"]
-                                        if isinstance(output, str):
-                                            # Check for data URL format
-                                            if "data:image" in output:
-                                                try:
-                                                    # Extract base64 data from data URL
-                                                    data_parts = output.split(",", 1)
-                                                    if len(data_parts) == 2:
-                                                        mime_part = data_parts[0].split(";")[0].replace("data:", "")
-                                                        result.images.append({
-                                                            "mime_type": mime_part,
-                                                            "data": data_parts[1]
-                                                        })
-                                                except Exception:
-                                                    pass
-                                            # Store text output as artifact for reference
-                                            elif len(output) > 0 and len(output) < 10000:
-                                                result.artifacts.append({
-                                                    "name": "code_output",
-                                                    "data": {"type": "text", "content": output}
-                                                })
-                                
-                                # Function calls (for tracking)
-                                if "function_call" in part:
-                                    result.tool_calls.append(part["function_call"].get("name", "unknown"))
-                                
-                                # Executable code (for transparency)
-                                if "executable_code" in part:
-                                    code = part["executable_code"]
-                                    if "code" in code:
-                                        result.artifacts.append({
-                                            "name": "executed_code",
-                                            "data": {"language": code.get("language", "python"), "code": code["code"]}
-                                        })
-                        
-                        # Track model metadata
-                        if "model_version" in data:
-                            result.metadata["model"] = data["model_version"]
-                        if "usage_metadata" in data:
-                            result.metadata["usage"] = data["usage_metadata"]
-                            
                     except json.JSONDecodeError:
                         continue
 
-                return result
+                    text_before = result.text
+                    self._parse_rich_event(data, result)
+                    if result.text != text_before:
+                        yield result.text
 
         except httpx.TimeoutException:
             result.text = "Error: Request timed out"
-            return result
         except Exception as e:
             result.text = f"Error: {str(e)}"
-            return result
+
+    def _parse_rich_event(self, data: Dict[str, Any], result: AgentResponse) -> None:
+        """Accumulate one streamQuery event into `result`."""
+        # Track tool calls and artifacts
+        if "actions" in data:
+            actions = data["actions"]
+            if "state_delta" in actions and actions["state_delta"]:
+                result.metadata["state"] = actions["state_delta"]
+
+            # Handle artifact_delta from analytics agent / code executor
+            # ADK artifacts use google.genai.types.Content format:
+            # { "artifact_name": { "parts": [{ "inline_data": { "mime_type": "...", "data": "base64..." }}] }}
+            if "artifact_delta" in actions and actions["artifact_delta"]:
+                for artifact_name, artifact_data in actions["artifact_delta"].items():
+                    image_extracted = False
+
+                    if isinstance(artifact_data, dict):
+                        # Format 1: Direct inline_data
+                        if "inline_data" in artifact_data:
+                            inline = artifact_data["inline_data"]
+                            if inline.get("mime_type", "").startswith("image/"):
+                                data_str = inline.get("data", "")
+                                # Handle bytes if needed
+                                if isinstance(data_str, bytes):
+                                    import base64
+                                    data_str = base64.b64encode(data_str).decode('utf-8')
+                                result.images.append({
+                                    "mime_type": inline["mime_type"],
+                                    "data": data_str,
+                                    "name": artifact_name
+                                })
+                                image_extracted = True
+
+                        # Format 2: ADK Content format with parts array
+                        if "parts" in artifact_data:
+                            for part in artifact_data["parts"]:
+                                if "inline_data" in part:
+                                    inline = part["inline_data"]
+                                    if inline.get("mime_type", "").startswith("image/"):
+                                        data_str = inline.get("data", "")
+                                        if isinstance(data_str, bytes):
+                                            import base64
+                                            data_str = base64.b64encode(data_str).decode('utf-8')
+                                        result.images.append({
+                                            "mime_type": inline["mime_type"],
+                                            "data": data_str,
+                                            "name": artifact_name
+                                        })
+                                        image_extracted = True
+                                # Also check for text parts in artifacts
+                                if "text" in part:
+                                    result.artifacts.append({
+                                        "name": artifact_name,
+                                        "data": {"type": "text", "content": part["text"]}
+                                    })
+
+                        # Format 3: fileData format (GCS URIs, etc.)
+                        if "fileData" in artifact_data:
+                            file_data = artifact_data["fileData"]
+                            result.artifacts.append({
+                                "name": artifact_name,
+                                "data": {"type": "file", "uri": file_data.get("fileUri", ""), "mime_type": file_data.get("mimeType", "")}
+                            })
+
+                    # Store non-image artifacts for reference
+                    if not image_extracted and artifact_data:
+                        result.artifacts.append({
+                            "name": artifact_name,
+                            "data": artifact_data
+                        })
+
+        # Extract content parts
+        if "content" in data and "parts" in data["content"]:
+            for part in data["content"]["parts"]:
+                # Text content
+                if "text" in part:
+                    result.text = part["text"]
+
+                # Image content (inline data from model or code executor)
+                if "inline_data" in part:
+                    inline = part["inline_data"]
+                    if inline.get("mime_type", "").startswith("image/"):
+                        result.images.append({
+                            "mime_type": inline["mime_type"],
+                            "data": inline.get("data", "")
+                        })
+
+                # Code execution results (from analytics agent / VertexAiCodeExecutor)
+                if "code_execution_result" in part:
+                    exec_result = part["code_execution_result"]
+
+                    # Check for output_files (primary method for matplotlib/charts)
+                    # Format: [{"name": "...", "mime_type": "image/png", "data": "base64..."}]
+                    if "output_files" in exec_result and exec_result["output_files"]:
+                        for file_info in exec_result["output_files"]:
+                            mime = file_info.get("mime_type", file_info.get("mimeType", ""))
+                            if mime.startswith("image/"):
+                                data_str = file_info.get("data", "")
+                                if isinstance(data_str, bytes):
+                                    import base64
+                                    data_str = base64.b64encode(data_str).decode('utf-8')
+                                result.images.append({
+                                    "mime_type": mime,
+                                    "data": data_str,
+                                    "name": file_info.get("name", "chart")
+                                })
+                            else:
+                                # Non-image file artifact
+                                result.artifacts.append({
+                                    "name": file_info.get("name", "file"),
+                                    "data": {"type": "file", "mime_type": mime, "data": file_info.get("data", "")}
+                                })
+
+                    # Check for output text (might contain data URLs or plain output)
+                    if "output" in exec_result and exec_result["output"]:
+                        output = exec_result["output"]
+                        if isinstance(output, str):
+                            # Check for data URL format
+                            if "data:image" in output:
+                                try:
+                                    # Extract base64 data from data URL
+                                    data_parts = output.split(",", 1)
+                                    if len(data_parts) == 2:
+                                        mime_part = data_parts[0].split(";")[0].replace("data:", "")
+                                        result.images.append({
+                                            "mime_type": mime_part,
+                                            "data": data_parts[1]
+                                        })
+                                except Exception:
+                                    pass
+                            # Store text output as artifact for reference
+                            elif len(output) > 0 and len(output) < 10000:
+                                result.artifacts.append({
+                                    "name": "code_output",
+                                    "data": {"type": "text", "content": output}
+                                })
+
+                # Function calls (for tracking)
+                if "function_call" in part:
+                    result.tool_calls.append(part["function_call"].get("name", "unknown"))
+
+                # Executable code (for transparency)
+                if "executable_code" in part:
+                    code = part["executable_code"]
+                    if "code" in code:
+                        result.artifacts.append({
+                            "name": "executed_code",
+                            "data": {"language": code.get("language", "python"), "code": code["code"]}
+                        })
+
+        # Track model metadata
+        if "model_version" in data:
+            result.metadata["model"] = data["model_version"]
+        if "usage_metadata" in data:
+            result.metadata["usage"] = data["usage_metadata"]
 
     async def query(
         self,
@@ -336,6 +336,57 @@ def inject_custom_css() -> str:
         border: 1px solid {colors.success};
     }}
 
+    /* Compact Live Agent Status widget (sidebar) */
+    .agent-status-title {{
+        color: {colors.text_secondary};
+        font-size: 0.7rem;
+        text-transform: uppercase;
+        letter-spacing: 1px;
+        margin: 12px 0 6px 0;
+    }}
+
+    .agent-alert-high, .agent-alert-med, .agent-alert-ok {{
+        border-radius: 8px;
+        padding: 8px 12px;
+        margin-bottom: 8px;
+        font-size: 0.8rem;
+    }}
+
+    .agent-alert-high {{
+        background: rgba(239, 68, 68, 0.1);
+        border: 1px solid {colors.error};
+        color: {colors.error};
+    }}
+
+    .agent-alert-med {{
+        background: rgba(245, 158, 11, 0.1);
+        border: 1px solid {colors.warning};
+        color: {colors.warning};
+    }}
+
+    .agent-alert-ok {{
+        background: rgba(34, 197, 94, 0.1);
+        border: 1px solid {colors.success};
+        color: {colors.success};
+    }}
+
+    .agent-monitor {{
+        display: flex;
+        align-items: center;
+        gap: 6px;
+        padding: 4px 0;
+        color: {colors.text_muted};
+        font-size: 0.7rem;
+    }}
+
+    .agent-monitor .dot {{
+        width: 6px;
+        height: 6px;
+        background: {colors.accent_teal};
+        border-radius: 50%;
+        animation: pulse 2s infinite;
+    }}
+
     /* =========================================================================
        CUSTOM KPI CARD
        ========================================================================= */
@@ -390,6 +441,116 @@ def inject_custom_css() -> str:
         color: {colors.downgrade};
     }}
 
+    /* Demand Planner headline KPIs (baseline / sensed demand) */
+    .kpi-hero {{
+        background: linear-gradient(135deg, {colors.bg_secondary} 0%, {colors.bg_primary} 100%);
+        border: 1px solid {colors.border};
+        border-radius: 16px;
+        padding: 24px;
+        height: 140px;
+        transition: all 0.2s ease;
+    }}
+
+    .kpi-hero.uplift {{
+        border-color: {colors.uplift};
+        box-shadow: 0 0 20px rgba(20, 184, 166, 0.125);
+    }}
+
+    .kpi-hero.downgrade {{
+        border-color: {colors.downgrade};
+        box-shadow: 0 0 20px rgba(248, 113, 113, 0.125);
+    }}
+
+    .kpi-hero .label {{
+        color: {colors.text_secondary};
+        font-size: 0.75rem;
+        font-weight: 600;
+        text-transform: uppercase;
+        letter-spacing: 0.5px;
+        margin-bottom: 12px;
+    }}
+
+    .kpi-hero .row {{
+        display: flex;
+        align-items: baseline;
+        gap: 12px;
+    }}
+
+    .kpi-hero .value {{
+        color: {colors.text_primary};
+        font-family: 'JetBrains Mono', monospace;
+        font-size: 2.8rem;
+        font-weight: 700;
+        line-height: 1;
+    }}
+
+    .kpi-hero.uplift .value {{
+        color: {colors.uplift};
+    }}
+
+    .kpi-hero.downgrade .value {{
+        color: {colors.downgrade};
+    }}
+
+    .kpi-hero .units {{
+        color: {colors.text_primary};
+        font-size: 1.2rem;
+        font-weight: 600;
+    }}
+
+    .kpi-hero .sub {{
+        color: {colors.text_muted};
+        font-size: 0.85rem;
+        margin-top: 8px;
+    }}
+
+    /* =========================================================================
+       HITL OVERRIDE & APPROVAL
+       ========================================================================= */
+    .status-pill {{
+        display: inline-flex;
+        align-items: center;
+        gap: 8px;
+        border-radius: 20px;
+        padding: 6px 16px;
+        margin-bottom: 16px;
+        background: rgba(100, 116, 139, 0.125);
+        border: 1px solid {colors.text_muted};
+        color: {colors.text_muted};
+    }}
+
+    .status-pill .status {{
+        font-weight: 600;
+        text-transform: uppercase;
+        font-size: 0.75rem;
+    }}
+
+    .status-pill.pending {{
+        background: rgba(245, 158, 11, 0.125);
+        border-color: {colors.warning};
+        color: {colors.warning};
+    }}
+
+    .status-pill.approved {{
+        background: rgba(34, 197, 94, 0.125);
+        border-color: {colors.success};
+        color: {colors.success};
+    }}
+
+    .status-pill.rejected {{
+        background: rgba(239, 68, 68, 0.125);
+        border-color: {colors.error};
+        color: {colors.error};
+    }}
+
+    .reasoning-box {{
+        background: {colors.bg_secondary};
+        border: 1px solid {colors.border};
+        border-radius: 12px;
+        padding: 20px;
+        line-height: 1.6;
+    }}
+
     /* =========================================================================
        SCROLLBAR STYLES
        ========================================================================= */